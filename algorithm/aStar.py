@@ -1,26 +1,52 @@
 import utils.cgal.geometry as Geom
 from math import fabs, nan, isnan
-from utils.vertexUtils import convertToPoint, getClosestVertex, almostEqual, removeRepeatedVertsOrdered
-from algorithm.node import Node
+from utils.vertexUtils import convertToPoint, getClosestVertex, almostEqual, removeRepeatedVertsOrdered, getCableKey
+from algorithm.node import Node, REOPEN_NEVER, ENDPOINT_HEURISTICS, markExpanded, updateExistingNode
 from algorithm.cable import tightenCable, getLongCable
+from algorithm.parallelExpansion import ParallelExpander
 from model.modelService import Model
 from model.vertex import Vertex
-from utils.priorityQ import PriorityQ
+from utils.priorityQ import IndexedPriorityQ
 from utils.cgal.types import Polygon
 from utils.logger import Logger
 from algorithm.solutionLog import Solution, SolutionLog
 
 model = Model()
 logger = Logger()
+# Relative slack of the length lower bound, so a rounding difference never discards a cable of exactly MAX_CABLE
+_LENGTH_BOUND_SLACK = 1e-9
+# Successor generators
+MOVES_JOINT = "joint" # Both robots move at every step
+MOVES_SINGLE = "single" # One robot moves at every step, the other one stays
 
-def aStar(heuristic, debug=False) -> SolutionLog:
+def aStar(heuristic, debug=False, reopen=REOPEN_NEVER, workers=0, lazy=False, moves=MOVES_JOINT) -> SolutionLog:
+	"""
+	reopen: What to do with configurations reached again after their expansion, `REOPEN_NEVER` | `REOPEN_ON_BETTER`
+
+	workers: When positive, the children of each node are tightened in that many processes (see `ParallelExpander`)
+
+	lazy: Tighten each child only when it is dequeued (see `_lazyAStar()`), cannot be combined with `workers`
+
+	moves: The successor generator, `MOVES_JOINT` | `MOVES_SINGLE` (see `getMovePairs()`)
+	"""
+	if lazy:
+		if workers > 0: raise ValueError("The lazy search tightens one child at a time, it cannot use workers")
+		return _lazyAStar(heuristic, debug, reopen, moves)
+	if workers > 0:
+		with ParallelExpander(workers) as expander:
+			return _aStar(heuristic, debug, reopen, expander, moves)
+	return _aStar(heuristic, debug, reopen, None, moves)
+
+def _aStar(heuristic, debug, reopen, expander, moves) -> SolutionLog:
 	model.setSolution(SolutionLog(heuristic, model.MAX_CABLE))
 	nodeMap = {} # We keep a map of nodes here to update their child-parent relationship
-	q = PriorityQ(key1=Node.pQGetPrimaryCost, key2=Node.pQGetSecondaryCost) # The Priority Queue container
+	closed = set() # Keys of the expanded configurations
+	q = IndexedPriorityQ(key1=Node.pQGetPrimaryCost, key2=Node.pQGetSecondaryCost) # The Priority Queue container
 	logger.log("##############################################")
 	logger.log("##################  A-STAR  ##################")
 	logger.log("CABLE-O: %s - L = %.2f" % (repr(model.cable), Geom.lengthOfCurve(model.cable)))
-	logger.log("Heuristic = %s" % heuristic)
+	logger.log("Heuristic = %s, moves = %s" % (heuristic, moves))
+	memoStart = (model.tightenMemo.hits, model.tightenMemo.misses)
 	root = Node(cable=model.cable, parent=None, heuristicFuncName=heuristic, debug=debug)
 	q.enqueue(root)
 	count = 0
@@ -28,53 +54,172 @@ def aStar(heuristic, debug=False) -> SolutionLog:
 	while not q.isEmpty():
 		n: Node = q.dequeue()
 		count += 1
-		# visited.add(n)
-		if debug: logger.log("-------------MAX=%.2f, MIN=%.2f @ %s-------------" % (Node.pQGetPrimaryCost(n), Node.pQGetSecondaryCost(n), getCableId(n.cable, n.fractions)))
+		markExpanded(n, closed, model.solution)
+		if debug: logger.log("-------------MAX=%.2f, MIN=%.2f @ %s-------------" % (Node.pQGetPrimaryCost(n), Node.pQGetSecondaryCost(n), repr(n.cable)))
 		if isAtDestination(n):
 			model.solution.content = Solution.createFromNode(n)
-			model.solution.expanded = count
-			model.solution.genereted = len(nodeMap)
+			_setSearchStats(count, nodeMap, memoStart)
 			logger.log("At Destination after expanded %d nodes, discovering %d configs" % (model.solution.expanded, model.solution.genereted))
+			_logSearchStats()
 			destinationsFound += 1
 			return model.solution
-		# Va = n.cable[0].gaps if n.fractions[0] == 1 else {n.cable[0]}
-		Va = n.cable[0].gaps if n.cable[0].name != "D1" else {n.cable[0]}
-		for va in Va:
-			if isUndoingLastMove(n, va, 0): continue
-			# Vb = n.cable[-1].gaps if n.fractions[1] == 1 else {n.cable[-1]}
-			Vb = n.cable[-1].gaps if n.cable[-1].name != "D2" else {n.cable[-1]}
-			for vb in Vb:
-				if isUndoingLastMove(n, vb, -1): continue
-				if areBothStaying(n, va, vb): continue
-				# For now I deliberately avoid cross movement because it crashes the triangulation
-				# In reality we can fix this by mirorring the space (like I did in the previous paper)
-				if isThereCrossMovement(n.cable, va, vb): continue
-				newCable = None
-				# FIXME: Defensively ignoring exceptions
-				try:
-					newCable = tightenCable(n.cable, va, vb)
-				except:
-					continue
-				l = Geom.lengthOfCurve(newCable)
-				if l <= model.MAX_CABLE:
-					addChildNode(newCable, n, nodeMap, q, heuristic, debug)
-				# else:
-				# 	(frac, fracCable) = getPartialMotion(n.cable, newCable, isRobotA=True, debug=debug)
-				# 	if not isnan(frac): addChildNode(fracCable, n, nodeMap, q, debug, fractions=[frac, 1])
-				# 	(frac, fracCable) = getPartialMotion(n.cable, newCable, isRobotA=False, debug=debug)
-				# 	if not isnan(frac): addChildNode(fracCable, n, nodeMap, q, debug, fractions=[1, frac])
+		pairs = getMovePairs(n, moves)
+		model.solution.tightenCalls += len(pairs)
+		newCables = expander.tightenAll(n.cable, pairs) if expander else [tightenOrNone(n.cable, va, vb) for (va, vb) in pairs]
+		for newCable in newCables:
+			# FIXME: Defensively ignoring exceptions
+			if not newCable: continue
+			l = Geom.lengthOfCurve(newCable)
+			if l <= model.MAX_CABLE:
+				addChildNode(newCable, n, nodeMap, q, heuristic, debug, closed=closed, reopen=reopen, solutionLog=model.solution)
+			# else:
+			# 	(frac, fracCable) = getPartialMotion(n.cable, newCable, isRobotA=True, debug=debug)
+			# 	if not isnan(frac): addChildNode(fracCable, n, nodeMap, q, debug, fractions=[frac, 1])
+			# 	(frac, fracCable) = getPartialMotion(n.cable, newCable, isRobotA=False, debug=debug)
+			# 	if not isnan(frac): addChildNode(fracCable, n, nodeMap, q, debug, fractions=[1, frac])
 	logger.log("Total Nodes: %d, %d configs, %d destinations" % (count, len(nodeMap), destinationsFound))
-	model.solution.expanded = count
-	model.solution.genereted = len(nodeMap)
+	_setSearchStats(count, nodeMap, memoStart)
+	model.solution.setEndTime()
+	return model.solution
+
+def _lazyAStar(heuristic, debug, reopen, moves) -> SolutionLog:
+	"""
+	Children are queued untightened, as nodes whose cable is only the two moves `[va, vb]`.
+	g only depends on the ends of the cable and so do the heuristics in `ENDPOINT_HEURISTICS`, so the key of such a child is exact.
+	Any other heuristic is replaced by `_heuristicShortestPath` (a lower bound of it) until the child is tightened.
+	A child is tightened, and checked against `MAX_CABLE`, once it is dequeued. If its key got worse it is queued again.
+	"""
+	model.setSolution(SolutionLog(heuristic, model.MAX_CABLE))
+	optimistic = heuristic if heuristic in ENDPOINT_HEURISTICS else "_heuristicShortestPath"
+	nodeMap = {} # We keep a map of nodes here to update their child-parent relationship
+	closed = set() # Keys of the expanded configurations
+	untightened = set() # The queued children that are not tightened yet
+	q = IndexedPriorityQ(key1=Node.pQGetPrimaryCost, key2=Node.pQGetSecondaryCost) # The Priority Queue container
+	logger.log("##############################################")
+	logger.log("###############  LAZY A-STAR  ################")
+	logger.log("CABLE-O: %s - L = %.2f" % (repr(model.cable), Geom.lengthOfCurve(model.cable)))
+	logger.log("Heuristic = %s, moves = %s" % (heuristic, moves))
+	memoStart = (model.tightenMemo.hits, model.tightenMemo.misses)
+	root = Node(cable=model.cable, parent=None, heuristicFuncName=heuristic, debug=debug)
+	q.enqueue(root)
+	count = 0
+	while not q.isEmpty():
+		n: Node = q.dequeue()
+		if n in untightened:
+			untightened.remove(n)
+			if not _tightenLazyChild(n, heuristic, nodeMap, q, closed, reopen, debug): continue
+		count += 1
+		markExpanded(n, closed, model.solution)
+		if debug: logger.log("-------------MAX=%.2f, MIN=%.2f @ %s-------------" % (Node.pQGetPrimaryCost(n), Node.pQGetSecondaryCost(n), repr(n.cable)))
+		if isAtDestination(n):
+			model.solution.content = Solution.createFromNode(n)
+			_setSearchStats(count, nodeMap, memoStart, len(untightened))
+			logger.log("At Destination after expanded %d nodes, discovering %d configs" % (model.solution.expanded, model.solution.genereted))
+			_logSearchStats()
+			return model.solution
+		for (va, vb) in getMovePairs(n, moves):
+			child = Node(cable=[va, vb], parent=n, heuristicFuncName=optimistic, debug=debug)
+			untightened.add(child)
+			q.enqueue(child)
+	logger.log("Total Nodes: %d, %d configs" % (count, len(nodeMap)))
+	_setSearchStats(count, nodeMap, memoStart, len(untightened))
 	model.solution.setEndTime()
 	return model.solution
 
+def _tightenLazyChild(n: Node, heuristic, nodeMap, q, closed, reopen, debug) -> bool:
+	"""
+	Tightens a child queued by `_lazyAStar()` and registers its configuration.
+
+	Returns
+	===
+	`True` if the child should be expanded right away, `False` if it was dropped, merged into a known configuration or queued again
+	"""
+	model.solution.tightenCalls += 1
+	newCable = tightenOrNone(n.parent.cable, n.cable[0], n.cable[-1])
+	# FIXME: Defensively ignoring exceptions
+	if not newCable or Geom.lengthOfCurve(newCable) > model.MAX_CABLE: return False
+	cableKey = getCableKey(newCable, n.fractions)
+	if cableKey in closed and reopen == REOPEN_NEVER: return False
+	if cableKey in nodeMap:
+		updateExistingNode(nodeMap[cableKey], n.parent, cableKey, q, closed, reopen, model.solution)
+		if debug: logger.log("UPDATE %s @ %s" % (repr(nodeMap[cableKey].f), repr(newCable)))
+		return False
+	n.cable = newCable
+	nodeMap[cableKey] = n
+	if n.heuristicFuncName == heuristic: return True
+	optimisticKey = (Node.pQGetPrimaryCost(n), Node.pQGetSecondaryCost(n))
+	n.setHeuristic(heuristic)
+	if (Node.pQGetPrimaryCost(n), Node.pQGetSecondaryCost(n)) > optimisticKey:
+		q.enqueue(n)
+		return False
+	return True
+
+def _setSearchStats(count, nodeMap, memoStart, tightenSkipped=0) -> None:
+	model.solution.expanded = count
+	model.solution.genereted = len(nodeMap)
+	model.solution.tightenSkipped = tightenSkipped
+	model.solution.setTightenStats(model.tightenMemo, memoStart)
+
+def _logSearchStats() -> None:
+	logger.log("Tighten memo: %d hits, %d misses" % (model.solution.tightenHits, model.solution.tightenMisses))
+	logger.log("Tightened %d children, skipped %d" % (model.solution.tightenCalls, model.solution.tightenSkipped))
+	logger.log("Length bound discarded %d moves before the cross movement test and tightening" % model.solution.lengthPruned)
+	logger.log("Re-expanded %d nodes, reopened %d" % (model.solution.reexpanded, model.solution.reopened))
+	for (heuristic, seconds) in model.solution.heuristicTimes.items():
+		logger.log("%s: %d calls in %.2fs" % (heuristic, model.solution.heuristicCalls[heuristic], seconds))
+
+def getMovePairs(n: Node, moves=MOVES_JOINT) -> list:
+	"""
+	Moves whose ends are farther apart than `MAX_CABLE` are discarded before any CGAL call,
+	since the taut cable between them is never shorter than the straight line. They are counted in `SolutionLog.lengthPruned`.
+
+	Params
+	===
+	moves: `MOVES_JOINT` for every combination of the moves of the two robots,
+	`MOVES_SINGLE` for the moves of one robot while the other one stays
+
+	Returns
+	===
+	The list of moves (va, vb) of the two robots to tighten for the children of the node
+	"""
+	pairs = []
+	# Va = n.cable[0].gaps if n.fractions[0] == 1 else {n.cable[0]}
+	Va = n.cable[0].gaps if n.cable[0].name != "D1" else {n.cable[0]}
+	Va = [va for va in Va if not isUndoingLastMove(n, va, 0)]
+	# Vb = n.cable[-1].gaps if n.fractions[1] == 1 else {n.cable[-1]}
+	Vb = n.cable[-1].gaps if n.cable[-1].name != "D2" else {n.cable[-1]}
+	Vb = [vb for vb in Vb if not isUndoingLastMove(n, vb, -1)]
+	# The last item of each list is the robot staying where it is
+	A = Va + [n.cable[0]]
+	B = Vb + [n.cable[-1]]
+	if moves == MOVES_SINGLE:
+		indices = [(i, len(Vb)) for i in range(len(Va))] + [(len(Va), j) for j in range(len(Vb))]
+	else:
+		indices = [(i, j) for i in range(len(Va)) for j in range(len(Vb))]
+	if not indices: return pairs
+	fits = Geom.distanceMatrix(A, B) <= model.MAX_CABLE * (1 + _LENGTH_BOUND_SLACK)
+	for (i, j) in indices:
+		(va, vb) = (A[i], B[j])
+		if areBothStaying(n, va, vb): continue
+		if not fits[i, j]:
+			model.solution.lengthPruned += 1
+			continue
+		# For now I deliberately avoid cross movement because it crashes the triangulation
+		# In reality we can fix this by mirorring the space (like I did in the previous paper)
+		if isThereCrossMovement(n.cable, va, vb): continue
+		pairs.append((va, vb))
+	return pairs
+
+def tightenOrNone(cable, va, vb):
+	try:
+		return tightenCable(cable, va, vb)
+	except:
+		return None
+
 def isUndoingLastMove(node, v, index):
 	if not node.parent: return False
 	if v.name == "D1" or v.name == "D2": return False
 	if convertToPoint(node.parent.cable[index]) != convertToPoint(v): return False
-	path = node._getPath(index  == 0)
-	path = removeRepeatedVertsOrdered(path)
 	if convertToPoint(node.parent.cable[-2]) != convertToPoint(v): return False
 	return True
 
@@ -95,19 +240,16 @@ def isAtDestination(n) -> bool:
 	if not n: return False
 	return convertToPoint(n.cable[0]) == convertToPoint(model.robots[0].destination) and convertToPoint(n.cable[-1]) == convertToPoint(model.robots[1].destination)
 
-def getCableId(cable, fractions) -> str:
-	# return "%s-[%.6f, %.6f]" % (repr(cable), fractions[0], fractions[1])
-	return repr(cable)
-
-def addChildNode(newCable, parent, nodeMap, pQ, heuristic, debug, fractions=[1, 1]) -> None:
-	cableStr = getCableId(newCable, fractions)
-	if cableStr in nodeMap:
-		nodeMap[cableStr].updateParent(parent)
-		if debug: logger.log("UPDATE %s @ %s" % (repr(nodeMap[cableStr].f), cableStr))
+def addChildNode(newCable, parent, nodeMap, pQ, heuristic, debug, fractions=[1, 1], closed=frozenset(), reopen=REOPEN_NEVER, solutionLog=None) -> None:
+	cableKey = getCableKey(newCable, fractions)
+	if cableKey in closed and reopen == REOPEN_NEVER: return
+	if cableKey in nodeMap:
+		updateExistingNode(nodeMap[cableKey], parent, cableKey, pQ, closed, reopen, solutionLog)
+		if debug: logger.log("UPDATE %s @ %s" % (repr(nodeMap[cableKey].f), repr(newCable)))
 	else:
 		child = Node(cable=newCable, parent=parent, heuristicFuncName=heuristic, debug=debug, fractions=fractions)
-		if debug: logger.log("ADDING %s @ %s" % (repr(child.f), cableStr))
-		nodeMap[cableStr] = child
+		if debug: logger.log("ADDING %s @ %s" % (repr(child.f), repr(newCable)))
+		nodeMap[cableKey] = child
 		pQ.enqueue(child)
 
 def getPartialMotion(oldCable, newCable, isRobotA, debug) -> list:
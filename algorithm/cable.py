@@ -18,29 +18,94 @@ def tightenCable(cable: VertList, destA: Vertex, destB: Vertex, debugTri=False)
 	"""
 	Here we force the sleeve to be made up of the triangles to the left and to the right of the edges.
 	Whichever leads to a shorter path we accept that one.
+
+	Results (and failures) are memoized in `model.tightenMemo`, keyed by the vertices of the cable and the destinations.
 	"""
+	if debugTri or model.tightenMemo.capacity <= 0:
+		return _tightenCableBothSides(cable, destA, destB, debugTri)
+	key = (tuple(cable), destA, destB)
+	(found, entry) = model.tightenMemo.get(key)
+	if not found:
+		try:
+			entry = (True, _tightenCableBothSides(cable, destA, destB, debugTri))
+		except Exception as err:
+			entry = (False, err)
+		model.tightenMemo.put(key, entry)
+	(succeeded, result) = entry
+	if not succeeded:
+		# Drop the old traceback, otherwise it grows every time the cached exception is raised
+		raise result.with_traceback(None)
+	return result[:]
+
+def _tightenCableBothSides(cable: VertList, destA: Vertex, destB: Vertex, debugTri=False) -> VertList:
+	"""
+	The preprocessing and the triangulation do not depend on the side, so they are done once and shared by both sleeve walks.
+
+	If the model has a workspace triangulation, the sleeve is extracted from it instead, unless the walk fails.
+	"""
+	if model.workspaceTriangulation and not debugTri:
+		tightened = _tightenCableInWorkspace(cable[:], destA, destB)
+		if tightened: return tightened
 	cableCopy = cable[:] # The method mutates the list object
-	pl = _tightenCable(cableCopy, destA, destB, True, debugTri)
-	cableCopy = cable[:] # The method mutates the list object
-	pr = _tightenCable(cableCopy, destA, destB, False, False) # only one of them should print the triangulation edges
+	(tri, longCable, destA, destB, trivial) = _prepareTightening(cableCopy, destA, destB, debugTri)
+	if trivial: return trivial
+	pl = _tightenCable(tri, longCable, destA, destB, True)
+	pr = _tightenCable(tri, longCable, destA, destB, False)
 	return pl if Geom.lengthOfCurve(pl) < Geom.lengthOfCurve(pr) else pr
 
-def _tightenCable(cable: VertList, destA: Vertex, destB: Vertex, isLeft:bool, debugTri=False) -> VertList:
+def _tightenCableInWorkspace(cable: VertList, destA: Vertex, destB: Vertex) -> VertList:
 	"""
-	This is an altered version of "Hershberger, J., & Snoeyink, J. (1994). Computing minimum length paths of a given homotopy class."
+	Returns `None` if the sleeve could not be extracted from `model.workspaceTriangulation`
+	"""
+	# A bend on a vertex the cable already wraps keeps that vertex (e.g. a robot sitting on an obstacle vertex)
+	cableVertices = {(convertToPoint(v).x(), convertToPoint(v).y()): v for v in cable}
+	(cable, longCable, destA, destB, trivial) = _preprocessForTightening(cable, destA, destB)
+	if trivial: return trivial
+	sleeve = model.workspaceTriangulation.getSleeve(longCable)
+	if not sleeve: return None
+	pathPt = model.workspaceTriangulation.getShortestPath(destA, destB, sleeve)
+	bends = [cableVertices.get((pt.x(), pt.y()), model.workspaceTriangulation.getObstacleVertex(pt)) for pt in pathPt[1:-1]]
+	if None in bends: return None
+	pathVt = removeRepeatedVertsOrdered([getClosestVertex(destA)] + bends + [getClosestVertex(destB)])
+	if len(pathVt) < 2: return [getClosestVertex(destA), getClosestVertex(destB)]
+	return pathVt
 
-	https://doi.org/10.1016/0925-7721(94)90010-8
+def _preprocessForTightening(cable: VertList, destA: Vertex, destB: Vertex) -> tuple:
+	"""
+	Returns
+	===
+	A tuple (cable, longCable, destA, destB, trivial) with the cable pushed away from the obstacles.
+	If the cable is trivially tight, `trivial` is the tightened cable and the rest of the tuple should not be used.
 	"""
 	(cable, destA, destB) = preprocessTheCable(cable, destA, destB)
 	(cable, destA, destB) = pushCableAwayFromObstacles(cable, destA, destB)
 	longCable = getLongCable(cable, destA, destB)
-	if len(longCable) == 2: return [getClosestVertex(pt) for pt in longCable]
+	if len(longCable) == 2: return (cable, longCable, destA, destB, [getClosestVertex(pt) for pt in longCable])
 	longCable = removeRepeatedVertsOrdered(longCable)
-	if len(longCable) == 2: return [getClosestVertex(pt) for pt in longCable]
+	if len(longCable) == 2: return (cable, longCable, destA, destB, [getClosestVertex(pt) for pt in longCable])
+	return (cable, longCable, destA, destB, None)
+
+def _prepareTightening(cable: VertList, destA: Vertex, destB: Vertex, debugTri=False) -> tuple:
+	"""
+	Returns
+	===
+	A tuple (triangulation, longCable, destA, destB, trivial).
+	If the cable is trivially tight, `trivial` is the tightened cable and the rest of the tuple should not be used.
+	"""
+	(cable, longCable, destA, destB, trivial) = _preprocessForTightening(cable, destA, destB)
+	if trivial: return (None, longCable, destA, destB, trivial)
 	tri = Triangulation(cable, destA, destB, debug=debugTri)
 	# Edge case where the two robots go to the same point and cable is not making contact
 	if tri.triangleCount == 1:
-		return [getClosestVertex(pt) for pt in [destA, destB]]
+		return (tri, longCable, destA, destB, [getClosestVertex(pt) for pt in [destA, destB]])
+	return (tri, longCable, destA, destB, None)
+
+def _tightenCable(tri: Triangulation, longCable: VertList, destA: Vertex, destB: Vertex, isLeft:bool) -> VertList:
+	"""
+	This is an altered version of "Hershberger, J., & Snoeyink, J. (1994). Computing minimum length paths of a given homotopy class."
+
+	https://doi.org/10.1016/0925-7721(94)90010-8
+	"""
 	allCurrentTries = []
 	# We represent an edge by a python set to make checks easier
 	currE = getEdge(longCable[0], longCable[1])
@@ -256,6 +321,9 @@ def getShortestPath(tri: Triangulation, dest1: Vertex, dest2: Vertex, sleeve: li
 		raise RuntimeError("Here we are.")
 	funnel = Funnel(dest1, tri, sleeve)
 	pathPt = funnel.getShortestPath(dest2)
+	return _convertPathToVertices(pathPt, dest1, dest2)
+
+def _convertPathToVertices(pathPt: list, dest1: Vertex, dest2: Vertex) -> VertList:
 	pathVt = [getClosestVertex(pt) for pt in pathPt]
 	pathVt = removeRepeatedVertsOrdered(pathVt)
 	if len(pathVt) < 2: return [getClosestVertex(dest1), getClosestVertex(dest2)]
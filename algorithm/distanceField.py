@@ -0,0 +1,64 @@
+"""
+Shortest distances from every vertex to a destination over the reduced visibility graph.
+
+The destinations do not change during a search, so one reverse Dijkstra per destination
+replaces the searches the shortest path heuristic would otherwise run for every node.
+The distances are stored in a list indexed by the location id of the vertices (`Vertex.vid`).
+"""
+import heapq
+from math import inf
+
+from model.modelService import Model
+from utils.cgal.geometry import vertexDistance
+
+model = Model()
+
+def computeDistanceField(dest) -> list:
+	"""
+	Params
+	===
+	dest: A registered Vertex (usually a destination)
+
+	Returns
+	===
+	A list where item `vid` is the length of the shortest path on the `gaps` graph from the location `vid` to `dest`, or `inf`
+	"""
+	verts = [v for v in model.allVertexObjects if v.vid is not None]
+	count = max([v.vid for v in verts]) + 1
+	# The reverse graph: vid -> list of (vid of the vertex with an edge into it, edge length)
+	incoming = [[] for _ in range(count)]
+	for v in verts:
+		for u in v.gaps:
+			if u.vid is None: continue
+			incoming[u.vid].append((v.vid, vertexDistance(v, u)))
+	distances = [inf] * count
+	distances[dest.vid] = 0
+	heap = [(0, dest.vid)]
+	while heap:
+		(d, vid) = heapq.heappop(heap)
+		if d > distances[vid]: continue
+		for (other, length) in incoming[vid]:
+			if d + length < distances[other]:
+				distances[other] = d + length
+				heapq.heappush(heap, (distances[other], other))
+	return distances
+
+def computeDestinationDistances() -> list:
+	"""
+	Returns
+	===
+	A list with the distance field of each robot's destination, in the order of `model.robots`
+	"""
+	return [computeDistanceField(r.destination) for r in model.robots]
+
+def getDistanceToDestination(vert, index: int) -> float:
+	"""
+	Looks up the distance of a vertex to the destination of robot `index` (0 | -1).
+
+	Returns
+	===
+	`None` if the model has no distance fields or the vertex is not covered by them (e.g. a temp vertex added after they were computed)
+	"""
+	fields = model.destinationDistances
+	if not fields or vert.vid is None or vert.vid >= len(fields[index]): return None
+	return fields[index][vert.vid]
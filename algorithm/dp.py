@@ -1,82 +1,157 @@
 import utils.cgal.geometry as Geom
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from math import fabs, nan, isnan, inf
-from utils.vertexUtils import convertToPoint, getClosestVertex, almostEqual, removeRepeatedVertsOrdered, findSubCable
-from algorithm.node import Node, Cost
+from utils.vertexUtils import convertToPoint, getClosestVertex, almostEqual, removeRepeatedVertsOrdered, getCableKey, findSubCable
+from algorithm.node import Node, Cost, REOPEN_NEVER, markExpanded, updateExistingNode
 from algorithm.cable import tightenCable, getLongCable
+from algorithm.parallelExpansion import initWorker
 from algorithm.solutionLog import SolutionLog, Solution
 from model.modelService import Model
 from model.vertex import Vertex
-from utils.priorityQ import PriorityQ
+from utils.priorityQ import IndexedPriorityQ
 from utils.cgal.types import Polygon
 from utils.logger import Logger
 
 model = Model()
 logger = Logger()
+_LENGTH_TOLERANCE = 1e-6
 
-def dynamicProg(heuristic, debug=False) -> list:
+def dynamicProg(heuristic, debug=False, reopen=REOPEN_NEVER, workers=0, shareTables=True) -> list:
+	"""
+	workers: When positive, the subproblems are solved in that many processes, each holding a copy of the preset (see `Model.preset`)
+
+	shareTables: Share the tightened configurations and solutions between the subproblems (see `DpTables`), each worker process keeps its own tables
+	"""
 	logger.log("##############################################")
 	logger.log("##################  D----P  ##################")
 	logger.log("CABLE-O: %s - L = %.2f" % (repr(model.cable), Geom.lengthOfCurve(model.cable)))
 	logger.log("Heuristic = %s" % heuristic)
-	distA = []
-	cableA = []
-	pathA = []
-	distB = []
-	cableB = []
-	pathB = []
+	count = len(model.cable)
+	# Index 0 holds robot A's results for every i, index -1 robot B's
+	dists = {0: [inf] * count, -1: [inf] * count}
+	cables = {0: [None] * count, -1: [None] * count}
+	paths = {0: [None] * count, -1: [None] * count}
 	solution = SolutionLog(heuristic, model.MAX_CABLE)
-	runningSolution: SolutionLog = None
-	for i in range(len(model.cable)):
-		indices = [0, -1]
-		for robotIndex in indices:
-			cableSection = model.cable[i:] if robotIndex == 0 else model.cable[:i + 1]
-			baseIndex = -1 if robotIndex == 0 else 0
-			distArr = distA if robotIndex == 0 else distB
-			cableArr = cableA if robotIndex == 0 else cableB
-			pathArr = pathA if robotIndex == 0 else pathB
-			runningSolution = aStarSingle(model.cable, model.robots[robotIndex].destination, baseIndex, robotIndex, heuristic, enforceCable=cableSection, debug=debug)
-			solution.expanded += runningSolution.expanded
-			solution.genereted += runningSolution.genereted
-			if runningSolution.content:
-				ind = findSubCable(runningSolution.content.cable, cableSection[1:] if robotIndex == 0 else cableSection[:-1])
-				if ind < 0:
-					raise RuntimeError("What?")
-				dist = runningSolution.content.cost[robotIndex] + Geom.lengthOfCurve(model.cable[:i + 1] if robotIndex == 0 else model.cable[i:])
-				subCable = runningSolution.content.cable[:ind] if robotIndex == 0 else runningSolution.content.cable[ind + len(cableSection) - 1:]
-				path = runningSolution.content.paths[robotIndex]
-			else:
-				dist = inf
-				subCable = None
-				path = None
-			distArr.append(dist)
-			cableArr.append(subCable)
-			pathArr.append(path)
+	memoStart = (model.tightenMemo.hits, model.tightenMemo.misses)
+	# From the subproblems that keep the least of the cable to the ones that keep the most, so the solutions of the former can be reused
+	subproblems = [(i, 0) for i in reversed(range(count))] + [(i, -1) for i in range(count)]
+	for (i, robotIndex, dist, subCable, path, stats) in _solveSubproblems(subproblems, heuristic, debug, reopen, workers, shareTables):
+		solution.expanded += stats[0]
+		solution.genereted += stats[1]
+		solution.reexpanded += stats[2]
+		solution.reopened += stats[3]
+		dists[robotIndex][i] = dist
+		cables[robotIndex][i] = subCable
+		paths[robotIndex][i] = path
+	(distA, cableA, pathA) = (dists[0], cables[0], paths[0])
+	(distB, cableB, pathB) = (dists[-1], cables[-1], paths[-1])
 
+	# The length of c = cableA[i] + model.cable[i + 1:j] + cableB[j] from prefix sums of the lengths of the three parts
+	prefix = [0] * count # prefix[k] is the length of model.cable[:k + 1]
+	for k in range(1, count):
+		prefix[k] = prefix[k - 1] + Geom.vertexDistance(model.cable[k - 1], model.cable[k])
+	lengthA = [Geom.lengthOfCurve(c) if c else 0 for c in cableA]
+	lengthB = [Geom.lengthOfCurve(c) if c else 0 for c in cableB]
 	minCost = Cost()
-	paths = [None, None]
+	solutionPaths = [None, None]
 	solutionCable = None
-	for i in range(len(model.cable)):
+	for i in range(count):
 		if not cableA[i]: continue
-		for j in range(i, len(model.cable)):
+		for j in range(i, count):
 			if not cableB[j]: continue
-			c = cableA[i] + model.cable[i + 1:j] + cableB[j]
-			if Geom.lengthOfCurve(c) > model.MAX_CABLE: continue
 			d = Cost([distA[i], distB[j]])
-			if d.max()[0] < minCost.max()[0] or (d.max()[0] == minCost.max()[0] and d.min()[0] < minCost.min()[0]):
-				minCost = d
-				paths = [pathA[i], pathB[j]]
-				solutionCable = c
-	solution.content = Solution(solutionCable, paths, minCost)
+			if not (d.max()[0] < minCost.max()[0] or (d.max()[0] == minCost.max()[0] and d.min()[0] < minCost.min()[0])): continue
+			if j - 1 >= i + 1:
+				l = lengthA[i] + Geom.vertexDistance(cableA[i][-1], model.cable[i + 1]) + prefix[j - 1] - prefix[i + 1] + Geom.vertexDistance(model.cable[j - 1], cableB[j][0]) + lengthB[j]
+			else:
+				l = lengthA[i] + Geom.vertexDistance(cableA[i][-1], cableB[j][0]) + lengthB[j]
+			c = None
+			# The sums are rounded differently from lengthOfCurve(), which decides when the cable is right at the limit
+			if fabs(l - model.MAX_CABLE) <= _LENGTH_TOLERANCE:
+				c = cableA[i] + model.cable[i + 1:j] + cableB[j]
+				l = Geom.lengthOfCurve(c)
+			if l > model.MAX_CABLE: continue
+			minCost = d
+			solutionPaths = [pathA[i], pathB[j]]
+			solutionCable = c if c else cableA[i] + model.cable[i + 1:j] + cableB[j]
+	solution.content = Solution(solutionCable, solutionPaths, minCost)
+	solution.setTightenStats(model.tightenMemo, memoStart)
 	logger.log("At Destination after expanded %d nodes, discovering %d configs" % (solution.expanded, solution.genereted))
+	logger.log("Tighten memo: %d hits, %d misses" % (solution.tightenHits, solution.tightenMisses))
+	logger.log("Re-expanded %d nodes, reopened %d" % (solution.reexpanded, solution.reopened))
 	return solution
 
-def aStarSingle(cable, dest, baseIndex, robotIndex, heuristic, enforceCable=None, debug=False) -> SolutionLog:
+def _solveSubproblems(subproblems: list, heuristic, debug, reopen, workers, shareTables):
+	"""
+	Yields the result of each subproblem (see `solveSubproblem()`), in order when serial and as they finish when `workers` is positive
+	"""
+	if workers <= 0:
+		tables = DpTables(model.cable) if shareTables else None
+		for (i, robotIndex) in subproblems:
+			yield (i, robotIndex) + solveSubproblem(model.cable, i, robotIndex, heuristic, debug, reopen, tables)
+		if tables: logger.log("DP tables: %d configurations, children hits %d, misses %d, %d reused solutions" % (len(tables.children), tables.hits, tables.misses, tables.reusedSolutions))
+		return
+	if not model.preset: raise RuntimeError("Parallel DP needs a model that was loaded from a preset")
+	toVertices = lambda names: [model.entities[name] for name in names] if names is not None else None
+	cableNames = [v.name for v in model.cable]
+	with ProcessPoolExecutor(max_workers=workers, initializer=initWorker, initargs=(model.preset.path, model.preset.options, model.MAX_CABLE)) as executor:
+		futures = [executor.submit(_solveSubproblemByName, cableNames, i, robotIndex, heuristic, reopen, shareTables) for (i, robotIndex) in subproblems]
+		for future in as_completed(futures):
+			(i, robotIndex, dist, subCableNames, pathNames, stats) = future.result()
+			yield (i, robotIndex, dist, toVertices(subCableNames), toVertices(pathNames), stats)
+
+_workerTables = None # The DpTables of a worker process, for the subproblems it solves
+
+def _solveSubproblemByName(cableNames: list, i: int, robotIndex: int, heuristic, reopen, shareTables) -> tuple:
+	"""
+	Runs in a worker process, vertices cross the process boundary by name
+	"""
+	global _workerTables
+	cable = [model.entities[name] for name in cableNames]
+	if shareTables and (not _workerTables or _workerTables.cable != cable): _workerTables = DpTables(cable)
+	(dist, subCable, path, stats) = solveSubproblem(cable, i, robotIndex, heuristic, False, reopen, _workerTables if shareTables else None)
+	toNames = lambda verts: [v.name for v in verts] if verts is not None else None
+	return (i, robotIndex, dist, toNames(subCable), toNames(path), stats)
+
+def solveSubproblem(cable: list, i: int, robotIndex: int, heuristic, debug=False, reopen=REOPEN_NEVER, tables=None) -> tuple:
+	"""
+	Moves one robot to its destination while the section of the cable on the other side of vertex `i` stays in place.
+	With `tables`, the solution of a subproblem that keeps less of the cable is reused when its configurations all keep this section.
+
+	Returns
+	===
+	(dist, subCable, path, (expanded, generated, reexpanded, reopened)), where `dist` is `inf` and `subCable` and `path` are `None` if there is no solution
+	"""
+	cableSection = cable[i:] if robotIndex == 0 else cable[:i + 1]
+	baseIndex = -1 if robotIndex == 0 else 0
+	runningSolution = tables.getSolution(robotIndex, len(cableSection) - 1) if tables else None
+	if runningSolution:
+		tables.reusedSolutions += 1
+		stats = (0, 0, 0, 0)
+	else:
+		runningSolution = aStarSingle(cable, model.robots[robotIndex].destination, baseIndex, robotIndex, heuristic, enforceCable=cableSection, debug=debug, reopen=reopen, tables=tables)
+		stats = (runningSolution.expanded, runningSolution.genereted, runningSolution.reexpanded, runningSolution.reopened)
+	if not runningSolution.content: return (inf, None, None, stats)
+	ind = findSubCable(runningSolution.content.cable, cableSection[1:] if robotIndex == 0 else cableSection[:-1])
+	if ind < 0:
+		raise RuntimeError("What?")
+	dist = runningSolution.content.cost[robotIndex] + Geom.lengthOfCurve(cable[:i + 1] if robotIndex == 0 else cable[i:])
+	subCable = runningSolution.content.cable[:ind] if robotIndex == 0 else runningSolution.content.cable[ind + len(cableSection) - 1:]
+	path = runningSolution.content.paths[robotIndex]
+	return (dist, subCable, path, stats)
+
+def aStarSingle(cable, dest, baseIndex, robotIndex, heuristic, enforceCable=None, debug=False, reopen=REOPEN_NEVER, tables=None) -> SolutionLog:
 	"""
 	baseIndex and robotIndex: 0 | -1
+
+	reopen: What to do with configurations reached again after their expansion, `REOPEN_NEVER` | `REOPEN_ON_BETTER`
+
+	tables: `DpTables` shared with the other subproblems of the same DP run, `enforceCable` must then be a suffix (robot A) or prefix (robot B) of its cable
 	"""
 	solutionLog = SolutionLog(heuristic)
 	nodeMap = {} # We keep a map of nodes here to update their child-parent relationship
-	q = PriorityQ(key1=Node.pQGetPrimaryCost, key2=Node.pQGetSecondaryCost) # The Priority Queue container
+	closed = set() # Keys of the expanded configurations
+	q = IndexedPriorityQ(key1=Node.pQGetPrimaryCost, key2=Node.pQGetSecondaryCost) # The Priority Queue container
 	if debug: logger.log("CABLE-O: %s - L = %.2f" % (repr(cable), Geom.lengthOfCurve(cable)))
 	root = Node(cable=cable, parent=None, heuristicFuncName=heuristic, fractions=[1, 1])
 	q.enqueue(root)
@@ -85,14 +160,23 @@ def aStarSingle(cable, dest, baseIndex, robotIndex, heuristic, enforceCable=None
 	while not q.isEmpty():
 		n: Node = q.dequeue()
 		count += 1
-		if debug: logger.log("-------------MAX=%.2f, MIN=%.2f @ %s-------------" % (Node.pQGetPrimaryCost(n), Node.pQGetSecondaryCost(n), getCableId(n.cable, n.fractions)))
+		markExpanded(n, closed, solutionLog)
+		if debug: logger.log("-------------MAX=%.2f, MIN=%.2f @ %s-------------" % (Node.pQGetPrimaryCost(n), Node.pQGetSecondaryCost(n), repr(n.cable)))
 		if isAtDestination(n, dest, robotIndex):
 			solutionLog.content = Solution.createFromNode(n)
 			solutionLog.expanded = count
 			solutionLog.genereted = len(nodeMap)
 			if debug: logger.log("At Destination after expanded %d nodes, discovering %d configs" % (solutionLog.expanded, solutionLog.genereted))
 			destinationsFound += 1
+			if tables and enforceCable: tables.addSolution(robotIndex, len(enforceCable) - 1, solutionLog, n)
 			return solutionLog
+		if tables:
+			for (gap, newCable, l, kept) in tables.getChildren(n, dest, baseIndex, robotIndex):
+				if isUndoingLastMove(n, gap, robotIndex): continue
+				if enforceCable and not 1 <= len(enforceCable) - 1 <= kept: continue
+				if l <= model.MAX_CABLE:
+					addChildNode(newCable, n, nodeMap, q, heuristic, debug, closed=closed, reopen=reopen, solutionLog=solutionLog)
+			continue
 		base = n.cable[baseIndex]
 		gaps = n.cable[robotIndex].gaps if n.cable[robotIndex].name != dest.name else {n.cable[robotIndex]}
 		for gap in gaps:
@@ -111,19 +195,18 @@ def aStarSingle(cable, dest, baseIndex, robotIndex, heuristic, enforceCable=None
 				if ind < 0: continue
 			l = Geom.lengthOfCurve(newCable)
 			if l <= model.MAX_CABLE:
-				addChildNode(newCable, n, nodeMap, q, heuristic, debug)
+				addChildNode(newCable, n, nodeMap, q, heuristic, debug, closed=closed, reopen=reopen, solutionLog=solutionLog)
 	if debug: logger.log("Total Nodes: %d, %d configs, %d destinations" % (count, len(nodeMap), destinationsFound))
 	solutionLog.expanded = count
 	solutionLog.genereted = len(nodeMap)
 	solutionLog.setEndTime()
+	if tables and enforceCable: tables.addSolution(robotIndex, len(enforceCable) - 1, solutionLog, None)
 	return solutionLog
 
 def isUndoingLastMove(node, v, index):
 	if not node.parent: return False
 	if v.name == "D1" or v.name == "D2": return False
 	if convertToPoint(node.parent.cable[index]) != convertToPoint(v): return False
-	path = node._getPath(index  == 0)
-	path = removeRepeatedVertsOrdered(path)
 	if convertToPoint(node.parent.cable[-2]) != convertToPoint(v): return False
 	return True
 
@@ -137,17 +220,104 @@ def isAtDestination(n, dest, robotIndex) -> bool:
 
 	return convertToPoint(n.cable[robotIndex]) == convertToPoint(dest)
 
-def getCableId(cable, fractions) -> str:
-	# return "%s-[%.6f, %.6f]" % (repr(cable), fractions[0], fractions[1])
-	return repr(cable)
-
-def addChildNode(newCable, parent, nodeMap, pQ, heuristic, debug, fractions=[1, 1]) -> None:
-	cableStr = getCableId(newCable, fractions)
-	if cableStr in nodeMap:
-		nodeMap[cableStr].updateParent(parent)
-		if debug: logger.log("UPDATE %s @ %s" % (repr(nodeMap[cableStr].f), cableStr))
+def addChildNode(newCable, parent, nodeMap, pQ, heuristic, debug, fractions=[1, 1], closed=frozenset(), reopen=REOPEN_NEVER, solutionLog=None) -> None:
+	cableKey = getCableKey(newCable, fractions)
+	if cableKey in closed and reopen == REOPEN_NEVER: return
+	if cableKey in nodeMap:
+		updateExistingNode(nodeMap[cableKey], parent, cableKey, pQ, closed, reopen, solutionLog)
+		if debug: logger.log("UPDATE %s @ %s" % (repr(nodeMap[cableKey].f), repr(newCable)))
 	else:
 		child = Node(cable=newCable, parent=parent, heuristicFuncName=heuristic, fractions=fractions)
-		if debug: logger.log("ADDING %s @ %s" % (repr(child.f), cableStr))
-		nodeMap[cableStr] = child
+		if debug: logger.log("ADDING %s @ %s" % (repr(child.f), repr(newCable)))
+		nodeMap[cableKey] = child
 		pQ.enqueue(child)
+
+class DpTables(object):
+	"""
+	What the subproblems of one DP run have in common: they start from the same cable and differ only in the section of it they must keep.
+	The children of a configuration (the tightened cables and their lengths) are computed once for all of them,
+	along with how much of the section each child keeps, and the solution of a subproblem is reused by the ones that keep more
+	when every configuration of its path already keeps their section.
+	"""
+	def __init__(self, cable: list):
+		self.cable = cable
+		self.children = {} # (cable key, robotIndex) -> list of (gap, newCable, length, kept)
+		self.solutions = {0: [], -1: []} # robotIndex -> list of (section length, SolutionLog, minimum kept along the path)
+		self._kept = {} # (cable key, robotIndex) -> kept
+		self.hits = 0
+		self.misses = 0
+		self.reusedSolutions = 0
+
+	def _getSection(self, k: int, robotIndex: int) -> list:
+		return self.cable[len(self.cable) - k:] if robotIndex == 0 else self.cable[:k]
+
+	def getKept(self, cable: list, robotIndex: int) -> int:
+		"""
+		Returns
+		===
+		The largest `k` such that `cable` holds the last `k` vertices (robot A) or the first `k` (robot B) of the DP cable, 0 if none
+		"""
+		key = (getCableKey(cable), robotIndex)
+		if key in self._kept: return self._kept[key]
+		# Keeping a section implies keeping every shorter one, so the largest is found by a binary search
+		(lo, hi) = (0, len(self.cable) - 1)
+		while lo < hi:
+			mid = (lo + hi + 1) // 2
+			if findSubCable(cable, self._getSection(mid, robotIndex)) >= 0:
+				lo = mid
+			else:
+				hi = mid - 1
+		self._kept[key] = lo
+		return lo
+
+	def getChildren(self, n: Node, dest, baseIndex: int, robotIndex: int) -> list:
+		"""
+		The moves of `aStarSingle()` from `n` that do not depend on its parent nor on the section to keep
+
+		Returns
+		===
+		A list of (gap, newCable, length, kept)
+		"""
+		key = (getCableKey(n.cable), robotIndex)
+		if key in self.children:
+			self.hits += 1
+			return self.children[key]
+		self.misses += 1
+		children = []
+		base = n.cable[baseIndex]
+		gaps = n.cable[robotIndex].gaps if n.cable[robotIndex].name != dest.name else {n.cable[robotIndex]}
+		for gap in gaps:
+			if gap.name == base.name: continue
+			if areBothStaying(n, gap if robotIndex == 0 else base, base if robotIndex == 0 else gap): continue
+			# FIXME: Defensively ignoring exceptions
+			try:
+				newCable = tightenCable(n.cable, gap if robotIndex == 0 else base, base if robotIndex == 0 else gap)
+			except Exception as err:
+				model.removeTriangulationEdges()
+				continue
+			children.append((gap, newCable, Geom.lengthOfCurve(newCable), self.getKept(newCable, robotIndex)))
+		self.children[key] = children
+		return children
+
+	def addSolution(self, robotIndex: int, k: int, solutionLog: SolutionLog, n: Node) -> None:
+		"""
+		Records the result of the subproblem that keeps `k` vertices, `n` is the node at the destination or `None` if there is no solution
+		"""
+		minKept = inf
+		while n and n.parent:
+			minKept = min(minKept, self.getKept(n.cable, robotIndex))
+			n = n.parent
+		self.solutions[robotIndex].append((k, solutionLog, minKept))
+
+	def getSolution(self, robotIndex: int, k: int) -> SolutionLog:
+		"""
+		Returns
+		===
+		The solution of a subproblem that keeps fewer vertices and is also a solution when keeping `k` of them, or `None`
+		"""
+		if k < 1: return None
+		for (solvedK, solutionLog, minKept) in self.solutions[robotIndex]:
+			if solvedK < 1 or solvedK > k: continue
+			# The configurations that keep `k` vertices are a subset of the ones that keep `solvedK`
+			if not solutionLog.content or minKept >= k: return solutionLog
+		return None
@@ -0,0 +1,221 @@
+"""
+Hash-distributed A* (HDA*, see Kishimoto, Fukunaga & Botea 2009) over worker processes.
+
+Every configuration is owned by one worker, chosen by a hash of the vertex names of its cable.
+Each worker loads its own copy of the preset and keeps the open and closed lists of the configurations it owns.
+Children are sent to the inbox of their owner.
+
+The search runs in rounds. In each round every worker reads the messages sent to it in the previous round,
+expands up to `expansionsPerRound` nodes and reports back how many messages it sent to each worker.
+The main process keeps the best solution found so far (the incumbent), which the workers use to prune their open lists.
+The search ends when every open list is empty and no message is in flight, so the incumbent is optimal for the same
+objective as `aStar()`: the max of the two costs, with the min as the tie breaker.
+A worker that fails sends its exception to the main process, which stops the other workers and raises it.
+"""
+import multiprocessing
+import queue
+import zlib
+
+import utils.cgal.geometry as Geom
+from algorithm.aStar import getMovePairs, isAtDestination, tightenOrNone
+from algorithm.node import Node, Cost
+from algorithm.parallelExpansion import initWorker
+from algorithm.solutionLog import Solution, SolutionLog
+from model.modelService import Model
+from utils.logger import Logger
+from utils.priorityQ import IndexedPriorityQ
+
+model = Model()
+logger = Logger()
+
+_STOP = "stop"
+_ROUND = "round"
+_POLL_INTERVAL = 1 # Seconds between two checks that the workers are still running
+
+def getOwner(cableNames: list, workers: int) -> int:
+	"""
+	A hash that is the same in every process (unlike `hash()` of strings)
+	"""
+	return zlib.crc32("|".join(cableNames).encode()) % workers
+
+def _costKey(cost: Cost) -> tuple:
+	return (cost.max()[0], cost.min()[0])
+
+class _RemoteParent(object):
+	"""
+	Stands for a parent that lives in another process. The move generation only needs the cable of the parent.
+	"""
+	def __init__(self, cable):
+		self.cable = cable
+		self.parent = None
+
+class _Worker(object):
+	def __init__(self, wid, workers, heuristic, expansionsPerRound, inboxes, resultQ):
+		self.wid = wid
+		self.workers = workers
+		self.heuristic = heuristic
+		self.expansionsPerRound = expansionsPerRound
+		self.inboxes = inboxes
+		self.resultQ = resultQ
+		self.nodes = {} # Tuple of vertex names -> Node
+		self.paths = {} # Tuple of vertex names -> (names of the path of robot A, names of the path of robot B)
+		self.q = IndexedPriorityQ(key1=Node.pQGetPrimaryCost, key2=Node.pQGetSecondaryCost)
+		self.expanded = 0
+		self.incumbent = None # (cost key, cable names, paths names, Cost)
+
+	def receive(self, message) -> None:
+		(cableNames, g, pathNames, parentNames) = message
+		key = tuple(cableNames)
+		g = Cost(list(g))
+		node = self.nodes.get(key)
+		# Compared with the same objective as the incumbent, so a better min is not lost when the max is the same
+		if node and not _costKey(g) < _costKey(node.g): return
+		if not node:
+			node = Node(cable=[model.entities[name] for name in cableNames], parent=None, heuristicFuncName=self.heuristic)
+			self.nodes[key] = node
+		node.g = g
+		node.parent = _RemoteParent([model.entities[name] for name in parentNames]) if parentNames else None
+		self.paths[key] = pathNames
+		# Either a new node, an update of a queued one or the re-opening of an expanded one
+		self.q.enqueue(node)
+
+	def _isPruned(self, node) -> bool:
+		return self.incumbent is not None and _costKey(node.f) >= self.incumbent[0]
+
+	def _expand(self, node, sentTo: list) -> None:
+		cableNames = [v.name for v in node.cable]
+		(pathA, pathB) = self.paths[tuple(cableNames)]
+		for (va, vb) in getMovePairs(node):
+			newCable = tightenOrNone(node.cable, va, vb)
+			if not newCable or Geom.lengthOfCurve(newCable) > model.MAX_CABLE: continue
+			g0 = node.g[0] + Geom.vertexDistance(node.cable[0], newCable[0])
+			g1 = node.g[1] + Geom.vertexDistance(node.cable[-1], newCable[-1])
+			childNames = [v.name for v in newCable]
+			message = (childNames, (g0, g1), (pathA + [newCable[0].name], pathB + [newCable[-1].name]), cableNames)
+			owner = getOwner(childNames, self.workers)
+			if owner == self.wid:
+				self.receive(message)
+			else:
+				self.inboxes[owner].put(message)
+				sentTo[owner] += 1
+
+	def runRound(self, expected: int, incumbent) -> None:
+		for _ in range(expected):
+			self.receive(self.inboxes[self.wid].get())
+		if incumbent and (not self.incumbent or incumbent[0] < self.incumbent[0]): self.incumbent = incumbent
+		sentTo = [0] * self.workers
+		solution = None
+		expansions = 0
+		while not self.q.isEmpty() and expansions < self.expansionsPerRound:
+			node = self.q.dequeue()
+			if self._isPruned(node):
+				# Every other queued node is at least as expensive
+				while not self.q.isEmpty(): self.q.dequeue()
+				break
+			expansions += 1
+			if isAtDestination(node):
+				cableNames = [v.name for v in node.cable]
+				solution = (_costKey(node.g), cableNames, self.paths[tuple(cableNames)], list(node.g.vals))
+				self.incumbent = solution
+				continue
+			self._expand(node, sentTo)
+		self.expanded += expansions
+		self.resultQ.put((self.wid, None, (sentTo, len(self.q), self.expanded, len(self.nodes), solution)))
+
+def _runWorker(wid, workers, presetPath, options, maxCable, heuristic, expansionsPerRound, inboxes, commandQ, resultQ) -> None:
+	try:
+		initWorker(presetPath, options, maxCable)
+		model.setSolution(SolutionLog(heuristic, maxCable))
+		worker = _Worker(wid, workers, heuristic, expansionsPerRound, inboxes, resultQ)
+		while True:
+			command = commandQ.get()
+			if command[0] == _STOP: return
+			(_, expected, incumbent) = command
+			worker.runRound(expected, incumbent)
+	except Exception as e:
+		resultQ.put((wid, e, None))
+
+def _getResult(resultQ, processes: list) -> tuple:
+	"""
+	Waits for the next result of a worker, raising the exception of a worker that failed instead of waiting forever
+
+	Returns
+	===
+	(wid, the result of the round)
+	"""
+	exited = None
+	while True:
+		try:
+			(wid, error, result) = resultQ.get(timeout=_POLL_INTERVAL)
+		except queue.Empty:
+			# A failing worker puts its exception before exiting, so one more poll is given for it to arrive
+			if exited is not None: raise RuntimeError("HDA* worker %d exited with code %d" % (exited, processes[exited].exitcode))
+			exited = next((wid for (wid, p) in enumerate(processes) if p.exitcode is not None), None)
+			continue
+		if error: raise error
+		return (wid, result)
+
+def hdaStar(heuristic, workers=2, expansionsPerRound=4) -> SolutionLog:
+	"""
+	Params
+	===
+	workers: The number of worker processes, each of them loads the preset that populated the model (see `Model.preset`)
+
+	expansionsPerRound: How many nodes each worker expands between two synchronizations
+	"""
+	if not model.preset: raise RuntimeError("HDA* needs a model that was loaded from a preset")
+	model.setSolution(SolutionLog(heuristic, model.MAX_CABLE))
+	logger.log("##############################################")
+	logger.log("##################  HDA-STAR  ################")
+	logger.log("CABLE-O: %s - L = %.2f, %d workers" % (repr(model.cable), Geom.lengthOfCurve(model.cable), workers))
+	logger.log("Heuristic = %s" % heuristic)
+	inboxes = [multiprocessing.Queue() for _ in range(workers)]
+	commandQs = [multiprocessing.Queue() for _ in range(workers)]
+	resultQ = multiprocessing.Queue()
+	processes = []
+	for wid in range(workers):
+		args = (wid, workers, model.preset.path, model.preset.options, model.MAX_CABLE, heuristic, expansionsPerRound, inboxes, commandQs[wid], resultQ)
+		processes.append(multiprocessing.Process(target=_runWorker, args=args, daemon=True))
+	for p in processes: p.start()
+	finished = False
+	try:
+		rootNames = [v.name for v in model.cable]
+		rootPaths = ([rootNames[0]], [rootNames[-1]])
+		owner = getOwner(rootNames, workers)
+		inboxes[owner].put((rootNames, (0, 0), rootPaths, None))
+		expected = [0] * workers
+		expected[owner] = 1
+		incumbent = None
+		stats = [(0, 0)] * workers
+		rounds = 0
+		while True:
+			rounds += 1
+			for wid in range(workers):
+				commandQs[wid].put((_ROUND, expected[wid], incumbent))
+			expected = [0] * workers
+			openNodes = 0
+			for _ in range(workers):
+				(wid, (sentTo, openSize, expanded, generated, solution)) = _getResult(resultQ, processes)
+				for i in range(workers): expected[i] += sentTo[i]
+				openNodes += openSize
+				stats[wid] = (expanded, generated)
+				if solution and (not incumbent or solution[0] < incumbent[0]): incumbent = solution
+			if openNodes == 0 and sum(expected) == 0: break
+		finished = True
+	finally:
+		if finished:
+			for q in commandQs: q.put((_STOP,))
+		else:
+			# The workers may be blocked on their inboxes
+			for p in processes: p.terminate()
+		for p in processes: p.join()
+	model.solution.expanded = sum([s[0] for s in stats])
+	model.solution.genereted = sum([s[1] for s in stats])
+	if incumbent:
+		(_, cableNames, (pathA, pathB), g) = incumbent
+		toVertices = lambda names: [model.entities[name] for name in names]
+		model.solution.content = Solution(toVertices(cableNames), [toVertices(pathA), toVertices(pathB)], Cost(g))
+	else:
+		model.solution.setEndTime()
+	logger.log("HDA* finished after %d rounds, expanded %d nodes, discovering %d configs" % (rounds, model.solution.expanded, model.solution.genereted))
+	return model.solution
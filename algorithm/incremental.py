@@ -0,0 +1,261 @@
+"""
+Incremental replanning for when the destination of a robot moves, in the style of Lifelong Planning A* (Koenig, Likhachev & Furcy 2004).
+
+The planner keeps its search graph between plans: every configuration it generated, the children (tightened cables) of the ones
+it expanded and the parents of each one. g is the cost of the best path found so far and rhs the best cost its parents offer,
+a configuration is queued while the two differ and a plan only repairs those.
+When a destination moves, the configurations on the old destination vertex are dropped, the ones that see the new destination
+get their children again and the queue is keyed again with the new heuristic. Every other configuration keeps its children and its g.
+
+Costs are compared like the queue of `aStar()` does: the max of the two costs, with the min as the tie breaker.
+The children of a configuration must not depend on the path to it, so unlike `aStar()` the moves that undo the last one are kept.
+"""
+from math import inf
+
+import utils.cgal.geometry as Geom
+from algorithm.aStar import getMovePairs, isAtDestination, tightenOrNone, MOVES_JOINT
+from algorithm.distanceField import computeDestinationDistances
+from algorithm.node import Node
+from algorithm.solutionLog import Solution, SolutionLog
+from algorithm.visibility import updateVertexGaps
+from algorithm.workspaceTriangulation import WorkspaceTriangulation
+from model.destination import Destination
+from model.modelService import Model
+from utils.cgal.types import Point
+from utils.logger import Logger
+from utils.priorityQ import IndexedPriorityQ
+from utils.vertexUtils import getCableKey
+
+model = Model()
+logger = Logger()
+
+def moveDestination(index: int, x: float, y: float) -> None:
+	"""
+	Moves the destination of robot `index` (0 | -1) and updates what depends on it: the gaps from and to the destination,
+	the distance fields, the memo of the Trmpp heuristic (its keys do not hold the destinations)
+	and the workspace triangulation if the new destination is outside of it
+	"""
+	robot = model.robots[index]
+	old = robot.destination
+	dest = Destination(robot=robot, loc=Point(x, y))
+	model.setDestination(index, dest)
+	updateVertexGaps(dest, removed=old)
+	model.setDestinationDistances(computeDestinationDistances())
+	model.trmppMemo.clear()
+	triangulation = model.workspaceTriangulation
+	if triangulation:
+		(low, high) = (triangulation.boundaryPts[0], triangulation.boundaryPts[2])
+		if not (low.x() < x < high.x() and low.y() < y < high.y()):
+			model.setWorkspaceTriangulation(WorkspaceTriangulation())
+
+def _getKey(c0: float, c1: float) -> tuple:
+	return (max(c0, c1), min(c0, c1))
+
+def _getQueueKey(n: "_PlannerNode") -> tuple:
+	"""
+	The f of the smaller of g and rhs
+	"""
+	if _getKey(n._g0, n._g1) <= _getKey(n._rhs0, n._rhs1):
+		return _getKey(n._g0 + n._h0, n._g1 + n._h1)
+	return _getKey(n._rhs0 + n._h0, n._rhs1 + n._h1)
+
+def _getPrimaryKey(n: "_PlannerNode") -> float:
+	return _getQueueKey(n)[0]
+
+def _getSecondaryKey(n: "_PlannerNode") -> float:
+	return _getQueueKey(n)[1]
+
+def _getCostThrough(parent: "_PlannerNode", child: "_PlannerNode") -> tuple:
+	g0 = parent._g0 + Geom.vertexDistance(parent.cable[0], child.cable[0])
+	g1 = parent._g1 + Geom.vertexDistance(parent.cable[-1], child.cable[-1])
+	return (g0, g1)
+
+class _Configuration(object):
+	"""
+	Stands for a node without a parent, so the move generation does not prune the moves that undo the last one
+	"""
+	def __init__(self, cable):
+		self.cable = cable
+		self.parent = None
+
+class _PlannerNode(Node):
+	"""
+	`g` is inherited from `Node`, `parent` is the parent that gives rhs
+	"""
+	__slots__ = ("_rhs0", "_rhs1", "children", "parents")
+
+	def __init__(self, cable, heuristicFuncName):
+		super().__init__(cable=cable, parent=None, heuristicFuncName=heuristicFuncName)
+		self._g0 = self._g1 = inf
+		self._rhs0 = self._rhs1 = inf
+		self.children = None # The list of child nodes, `None` until the configuration is expanded
+		self.parents = {} # Used as an ordered set, so ties are broken the same way in every run
+
+	def isConsistent(self) -> bool:
+		return self._g0 == self._rhs0 and self._g1 == self._rhs1
+
+class IncrementalPlanner(object):
+	def __init__(self, heuristic="_heuristicShortestPath", moves=MOVES_JOINT):
+		"""
+		Plans from the cable of the model (see `plan()`) and keeps the search graph, so `setDestination()` only repairs it.
+
+		heuristic: One of the heuristics of `Node`, it is computed again for every configuration when a destination moves
+
+		moves: The successor generator, see `getMovePairs()`
+		"""
+		self.heuristic = heuristic
+		self.moves = moves
+		self.nodes = {} # Cable key -> _PlannerNode
+		self.goals = set() # The nodes with both robots at their destinations
+		self.q = IndexedPriorityQ(key1=_getPrimaryKey, key2=_getSecondaryKey)
+		model.setSolution(SolutionLog(heuristic, model.MAX_CABLE))
+		self.start = self._getNode(model.cable)
+		(self.start._rhs0, self.start._rhs1) = (0, 0)
+		self.q.enqueue(self.start)
+
+	def plan(self) -> SolutionLog:
+		"""
+		Repairs the configurations that are still queued, the first call is a plain search
+		"""
+		model.setSolution(SolutionLog(self.heuristic, model.MAX_CABLE))
+		logger.log("##############################################")
+		logger.log("##############  INCREMENTAL PLAN  ############")
+		return self._search()
+
+	def setDestination(self, index: int, x: float, y: float) -> SolutionLog:
+		"""
+		Moves the destination of robot `index` (0 | -1) and plans again. The time of the returned log includes the repair of the graph.
+		"""
+		model.setSolution(SolutionLog(self.heuristic, model.MAX_CABLE))
+		logger.log("##############################################")
+		logger.log("##############  INCREMENTAL REPLAN  ##########")
+		old = model.robots[index].destination
+		moveDestination(index, x, y)
+		dest = model.robots[index].destination
+		affected = {} # Used as an ordered set of the nodes whose parents changed
+		removed = set()
+		# The configurations on the old destination vertex are not in the graph anymore
+		for (key, n) in list(self.nodes.items()):
+			# The key ends with the two fractions (see `getCableKey()`), which could be mistaken for a uid
+			if old.uid not in key[:-2]: continue
+			del self.nodes[key]
+			removed.add(n)
+			self.q.remove(n)
+			for child in n.children or []:
+				child.parents.pop(n, None)
+				affected[child] = None
+			for parent in n.parents:
+				if parent.children: parent.children.remove(n)
+		# The expanded configurations where a robot sees the new destination gain moves
+		for n in list(self.nodes.values()):
+			if n.children is None: continue
+			if dest not in n.cable[0].gaps and dest not in n.cable[-1].gaps: continue
+			before = n.children
+			n.children = None
+			after = self._getChildren(n)
+			for child in before:
+				if child in after: continue
+				child.parents.pop(n, None)
+				affected[child] = None
+			for child in after:
+				if child not in before: affected[child] = None
+		self.goals = {n for n in self.nodes.values() if isAtDestination(n)}
+		# The heuristic changed for every configuration, so the queue is built again
+		for n in self.nodes.values():
+			n.h = n._calcH()
+		self.q = IndexedPriorityQ(key1=_getPrimaryKey, key2=_getSecondaryKey)
+		for n in self.nodes.values():
+			if not n.isConsistent(): self.q.enqueue(n)
+		for n in affected:
+			if n not in removed: self._updateNode(n)
+		logger.log("Destination of robot %d moved: %d configurations affected, %d queued" % (index, len(affected), len(self.q)))
+		return self._search()
+
+	def _search(self) -> SolutionLog:
+		count = 0
+		best = self._getBestGoal()
+		while not self.q.isEmpty() and (not best or self.q.peekKey() < _getKey(best._g0, best._g1)):
+			n: _PlannerNode = self.q.dequeue()
+			count += 1
+			if _getKey(n._g0, n._g1) > _getKey(n._rhs0, n._rhs1):
+				(n._g0, n._g1) = (n._rhs0, n._rhs1)
+				for child in self._getChildren(n):
+					g = _getCostThrough(n, child)
+					if _getKey(*g) < _getKey(child._rhs0, child._rhs1):
+						(child._rhs0, child._rhs1) = g
+						child.parent = n
+						self._queueIfInconsistent(child)
+			else:
+				(n._g0, n._g1) = (inf, inf)
+				self._updateNode(n)
+				for child in self._getChildren(n):
+					self._updateNode(child)
+			if n in self.goals or (best and not best.isConsistent()): best = self._getBestGoal()
+		model.solution.expanded = count
+		if best:
+			model.solution.content = Solution(best.cable, self._getPaths(best), best.g)
+		else:
+			model.solution.setEndTime()
+		logger.log("Expanded %d nodes, discovering %d new configs (%d in the graph), cost = %s" % (count, model.solution.genereted, len(self.nodes), repr(best.g) if best else "inf"))
+		return model.solution
+
+	def _getNode(self, cable: list) -> _PlannerNode:
+		key = getCableKey(cable)
+		n = self.nodes.get(key)
+		if n: return n
+		n = _PlannerNode(cable, self.heuristic)
+		self.nodes[key] = n
+		if isAtDestination(n): self.goals.add(n)
+		model.solution.genereted += 1
+		return n
+
+	def _getChildren(self, n: _PlannerNode) -> list:
+		if n.children is not None: return n.children
+		pairs = getMovePairs(_Configuration(n.cable), self.moves)
+		model.solution.tightenCalls += len(pairs)
+		children = {}
+		for (va, vb) in pairs:
+			newCable = tightenOrNone(n.cable, va, vb)
+			# FIXME: Defensively ignoring exceptions
+			if not newCable or Geom.lengthOfCurve(newCable) > model.MAX_CABLE: continue
+			child = self._getNode(newCable)
+			child.parents[n] = None
+			children[child] = None
+		n.children = list(children)
+		return n.children
+
+	def _updateNode(self, n: _PlannerNode) -> None:
+		"""
+		Computes rhs from the parents and queues the node if it is inconsistent
+		"""
+		if n is not self.start:
+			(n._rhs0, n._rhs1) = (inf, inf)
+			n.parent = None
+			for parent in n.parents:
+				g = _getCostThrough(parent, n)
+				if _getKey(*g) < _getKey(n._rhs0, n._rhs1):
+					(n._rhs0, n._rhs1) = g
+					n.parent = parent
+		self._queueIfInconsistent(n)
+
+	def _queueIfInconsistent(self, n: _PlannerNode) -> None:
+		if n.isConsistent():
+			self.q.remove(n)
+		else:
+			self.q.enqueue(n)
+
+	def _getBestGoal(self) -> _PlannerNode:
+		best = None
+		for n in self.goals:
+			if n._g0 == inf or not n.isConsistent(): continue
+			if not best or _getKey(n._g0, n._g1) < _getKey(best._g0, best._g1): best = n
+		return best
+
+	def _getPaths(self, n: _PlannerNode) -> list:
+		(pathA, pathB) = ([], [])
+		while n:
+			if len(pathA) > len(self.nodes): raise RuntimeError("The parents of the incremental planner form a cycle")
+			pathA.append(n.cable[0])
+			pathB.append(n.cable[-1])
+			n = n.parent
+		return [pathA[::-1], pathB[::-1]]
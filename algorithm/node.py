@@ -1,21 +1,30 @@
 from math import inf
 from functools import partial
+from timeit import default_timer as timer
+from algorithm.distanceField import getDistanceToDestination
 from model.modelService import Model
 from utils.cgal.geometry import vertexDistance, convertToPoint
-from utils.priorityQ import PriorityQ
+from utils.priorityQ import PriorityQ, IndexedPriorityQ
 from utils.logger import Logger
 
 logger = Logger()
 model = Model()
 INFINITY_COST = inf
+# Policies for configurations that are reached again after they were expanded
+REOPEN_NEVER = "never"
+REOPEN_ON_BETTER = "onBetterG" # Expand them again if the new parent gives a strictly better g
+# Heuristics that only read the two ends of the cable, so they give the same value before and after tightening
+ENDPOINT_HEURISTICS = {"_heuristicShortestPath", "_heuristicLineDist", "_heuristicNone"}
 
 # TODO: Add a + and - operators to cost class so the code would be cleaner
 class Cost(object):
-	def __init__(self, vals=[INFINITY_COST, INFINITY_COST]):
+	__slots__ = ("vals",)
+
+	def __init__(self, vals=(INFINITY_COST, INFINITY_COST)):
 		"""
-		vals: is a list of 2 numbers, the first is the cost for robot[0] and second is for robot[1]
+		vals: is a list (or tuple) of 2 numbers, the first is the cost for robot[0] and second is for robot[1]. It is stored as a tuple.
 		"""
-		self.vals = vals
+		self.vals = tuple(vals)
 
 	def __repr__(self):
 		c1 = ("%.2f" % self.vals[0]).ljust(7)
@@ -54,42 +63,94 @@ class _SimpleNode(object):
 
 class Node(object):
 	"""
-	The definition of a node in the planning tree
+	The definition of a node in the planning tree.
+
+	A search keeps one node per generated configuration, so nodes have no `__dict__` and keep their costs as plain floats.
+	`g`, `h` and `f` are built as `Cost` objects when they are read. The heuristic is looked up on the class by name when it is called.
 	"""
+	__slots__ = ("cable", "parent", "fractions", "debug", "heuristicFuncName", "_pathTail", "_g0", "_g1", "_h0", "_h1")
+
 	def __init__(self, cable, parent: "Node", debug=False, heuristicFuncName="_heuristicShortestPath", fractions=[1, 1]):
 		self.cable = cable
-		self.g = Cost()
-		self.h = Cost()
-		self.f = Cost()
+		self._g0 = self._g1 = INFINITY_COST
+		self._h0 = self._h1 = INFINITY_COST
 		self.debug = debug
 		self.parent: "Node" = None
+		# The paths of the robots as a persistent list (vertex of robot A, vertex of robot B, tail of the parent), so they share their prefix with the parent's
+		self._pathTail = (cable[0], cable[-1], None)
 		self.heuristicFuncName = heuristicFuncName
-		self._heuristic = getattr(self, self.heuristicFuncName)
-		# self._heuristic = self._heuristicTrmpp
-		self.updateParent(parent)
 		self.fractions = fractions # fractions is only defined for the two ends of the cable
+		self.updateParent(parent)
 
 	def __repr__(self):
 		return "%s - %s" % (repr(self.cable), repr(self.f))
 
+	@property
+	def g(self) -> Cost:
+		return Cost((self._g0, self._g1))
+
+	@g.setter
+	def g(self, cost: Cost):
+		(self._g0, self._g1) = cost.vals
+
+	@property
+	def h(self) -> Cost:
+		return Cost((self._h0, self._h1))
+
+	@h.setter
+	def h(self, cost: Cost):
+		(self._h0, self._h1) = cost.vals
+
+	@property
+	def f(self) -> Cost:
+		return Cost((self._g0 + self._h0, self._g1 + self._h1))
+
+	def setHeuristic(self, heuristicFuncName: str) -> None:
+		"""
+		Switches to another heuristic and updates h (and so f) accordingly
+		"""
+		self.heuristicFuncName = heuristicFuncName
+		self.h = self._calcH()
+
 	def _calcH(self) -> Cost:
-		return self._heuristic()
+		heuristic = getattr(Node, self.heuristicFuncName)
+		if not model.solution: return heuristic(self)
+		start = timer()
+		h = heuristic(self)
+		model.solution.addHeuristicTime(self.heuristicFuncName, timer() - start)
+		return h
 
 	def _heuristicTrmpp(self) -> Cost:
+		"""
+		The cost of a search from this configuration with a relaxed cable length.
+		Sub-searches are memoized in `model.trmppMemo` by cable and relaxed length, as nodes are reached (and updated) repeatedly.
+		"""
+		maxCable = model.MAX_CABLE * (len(self.cable) + 1) * 1.25
+		key = (getCableKey(self.cable), maxCable)
+		(found, vals) = model.trmppMemo.get(key)
+		if found: return Cost(vals[:])
 		root = Node(cable=self.cable, parent=None, debug=self.debug, heuristicFuncName="_heuristicShortestPath")
-		solution = _privateAStar(root=root, MAX_CABLE=model.MAX_CABLE * (len(self.cable) + 1) * 1.25, debug=self.debug)
+		solution = _privateAStar(root=root, MAX_CABLE=maxCable, debug=self.debug)
 		model.solution.expanded += solution.expanded
 		model.solution.genereted += solution.genereted
 		if self.debug: logger.log("T = %.2f" % solution.time)
-		if not solution.content:
-			return Cost()
-		return solution.content.cost
+		cost = solution.content.cost if solution.content else Cost()
+		model.trmppMemo.put(key, cost.vals[:])
+		return Cost(cost.vals[:])
 
 	def _heuristicShortestPath(self) -> Cost:
-		h1 = self._aStar(0).g
-		h2 = self._aStar(-1).g
+		h1 = self._getShortestPathLength(0)
+		h2 = self._getShortestPathLength(-1)
 		return Cost([h1, h2])
 
+	def _getShortestPathLength(self, index) -> float:
+		"""
+		Uses the precomputed distance fields of the model, and only searches for vertices they do not cover
+		"""
+		dist = getDistanceToDestination(self.cable[index], index)
+		if dist is not None: return dist
+		return self._aStar(index).g
+
 	def _heuristicLineDist(self) -> Cost:
 		h1 = vertexDistance(self.cable[0], model.robots[0].destination)
 		h2 = vertexDistance(self.cable[-1], model.robots[1].destination)
@@ -98,15 +159,13 @@ class Node(object):
 	def _heuristicNone(self) -> Cost:
 		return Cost([0, 0])
 
-	def _calcF(self) -> Cost:
-		return Cost([self.g[0] + self.h[0], self.g[1] + self.h[1]])
-
 	def _getPath(self, leftSide: bool):
 		path = []
-		node = self
-		while node:
-			path.append(node.cable[0 if leftSide else -1])
-			node = node.parent
+		index = 0 if leftSide else 1
+		tail = self._pathTail
+		while tail:
+			path.append(tail[index])
+			tail = tail[2]
 		return path[::-1]
 
 	def _aStar(self, index) -> "_SimpleNode":
@@ -123,12 +182,12 @@ class Node(object):
 				return n
 			for v in n.vert.gaps:
 				child = _SimpleNode(v, hFunc(v), n)
-				if v.name in nodeMap:
-					if child.f < nodeMap[v.name].f:
-						nodeMap[v.name] = child
+				if v.uid in nodeMap:
+					if child.f < nodeMap[v.uid].f:
+						nodeMap[v.uid] = child
 				else:
 					q.enqueue(child)
-					nodeMap[v.name] = child
+					nodeMap[v.uid] = child
 		return None
 
 	def getPaths(self) -> list:
@@ -137,53 +196,86 @@ class Node(object):
 
 	def updateParent(self, newParent: "Node") -> None:
 		if newParent:
-			g0 = newParent.g[0] + vertexDistance(newParent.cable[0], self.cable[0])
-			g1 = newParent.g[1] + vertexDistance(newParent.cable[-1], self.cable[-1])
-			tentativeCost = Cost([g0, g1])
-			if tentativeCost.max()[0] < self.g.max()[0]:
-				self.parent = newParent
-				self.g = tentativeCost
+			g0 = newParent._g0 + vertexDistance(newParent.cable[0], self.cable[0])
+			g1 = newParent._g1 + vertexDistance(newParent.cable[-1], self.cable[-1])
+			if max(g0, g1) < max(self._g0, self._g1):
 				self.parent = newParent
+				self._g0 = g0
+				self._g1 = g1
+				self._pathTail = (self.cable[0], self.cable[-1], newParent._pathTail)
 		else:
-			self.g = Cost([0, 0])
+			self._g0 = self._g1 = 0
 		self.h = self._calcH()
-		self.f = self._calcF()
 
 	@staticmethod
 	def pQGetPrimaryCost(n):
 		"""
 		Since the optimization metric is minimizing the max, this function returns the max of the two costs
 		"""
-		return n.f.max()[0]
+		return max(n._g0 + n._h0, n._g1 + n._h1)
 
 	@staticmethod
 	def pQGetSecondaryCost(n):
 		"""
 		Since the optimization metric is minimizing the max, this function returns the max of the two costs
 		"""
-		return n.f.min()[0]
+		return min(n._g0 + n._h0, n._g1 + n._h1)
 
 import utils.cgal.geometry as Geom
 from math import fabs, nan, isnan
-from utils.vertexUtils import convertToPoint, getClosestVertex, almostEqual, removeRepeatedVertsOrdered
+from utils.vertexUtils import convertToPoint, getClosestVertex, almostEqual, removeRepeatedVertsOrdered, getCableKey
 from algorithm.node import Node
 from algorithm.cable import tightenCable, getLongCable
 from model.vertex import Vertex
 from utils.cgal.types import Polygon
 from algorithm.solutionLog import Solution, SolutionLog
 
-def _privateAStar(root: Node, MAX_CABLE: int, debug=False) -> SolutionLog:
+def markExpanded(n: Node, closed: set, solutionLog: SolutionLog) -> None:
+	"""
+	Adds the configuration of the node to the closed set, or counts a re-expansion if it is already there
+	"""
+	key = getCableKey(n.cable, n.fractions)
+	if key in closed: solutionLog.reexpanded += 1
+	else: closed.add(key)
+
+def updateExistingNode(node: Node, parent: Node, cableKey: tuple, pQ, closed: set, reopen: str, solutionLog: SolutionLog) -> None:
+	"""
+	Called when `parent` reaches the configuration of `node` again.
+	An expanded node is left alone, unless the policy is `REOPEN_ON_BETTER` and its g improves, in which case it is queued again.
+	"""
+	isClosed = cableKey in closed
+	if isClosed and reopen == REOPEN_NEVER: return
+	before = node.g.max()[0]
+	node.updateParent(parent)
+	if node in pQ:
+		pQ.decreaseKey(node)
+	elif isClosed and node.g.max()[0] < before:
+		pQ.enqueue(node)
+		solutionLog.reopened += 1
+
+def _privateAStar(root: Node, MAX_CABLE: int, debug=False, reopen=REOPEN_NEVER) -> SolutionLog:
+	"""
+	When the heuristic of the root only reads the ends of the cable (see `ENDPOINT_HEURISTICS`), the key of a child is known before it is tightened.
+	Children are then queued as placeholders with the cable `[va, vb]` and only checked for cross movement and tightened once dequeued.
+	"""
 	if debug: logger.log("_privateAStar: root = %s, MAX = %d" % (root, MAX_CABLE))
 	solutionLog = SolutionLog(root.heuristicFuncName)
+	lazy = root.heuristicFuncName in ENDPOINT_HEURISTICS
 	nodeMap = {} # We keep a map of nodes here to update their child-parent relationship
-	q = PriorityQ(key1=Node.pQGetPrimaryCost, key2=Node.pQGetSecondaryCost) # The Priority Queue container
+	closed = set() # Keys of the expanded configurations
+	placeholders = set() # The queued children that are not tightened yet
+	q = IndexedPriorityQ(key1=Node.pQGetPrimaryCost, key2=Node.pQGetSecondaryCost) # The Priority Queue container
 	q.enqueue(root)
 	count = 0
 	destinationsFound = 0
 	while not q.isEmpty():
 		n: Node = q.dequeue()
+		if n in placeholders:
+			placeholders.remove(n)
+			_addTightenedChild(n.parent, n.cable[0], n.cable[-1], MAX_CABLE, nodeMap, q, closed, reopen, solutionLog)
+			continue
 		count += 1
-		# visited.add(n)
+		markExpanded(n, closed, solutionLog)
 		if isAtDestination(n):
 			solutionLog.content = Solution.createFromNode(n)
 			solutionLog.expanded = count
@@ -199,29 +291,35 @@ def _privateAStar(root: Node, MAX_CABLE: int, debug=False) -> SolutionLog:
 			for vb in Vb:
 				if isUndoingLastMove(n, vb, -1): continue
 				if areBothStaying(n, va, vb): continue
-				# For now I deliberately avoid cross movement because it crashes the triangulation
-				# In reality we can fix this by mirorring the space (like I did in the previous paper)
-				if isThereCrossMovement(n.cable, va, vb): continue
-				newCable = None
-				# FIXME: Defensively ignoring exceptions
-				try:
-					newCable = tightenCable(n.cable, va, vb)
-				except:
-					continue
-				l = Geom.lengthOfCurve(newCable)
-				if l <= MAX_CABLE:
-					addChildNode(newCable, n, nodeMap, q, False)
+				if lazy:
+					placeholder = Node(cable=[va, vb], parent=n, debug=n.debug, heuristicFuncName=root.heuristicFuncName)
+					placeholders.add(placeholder)
+					q.enqueue(placeholder)
+				else:
+					_addTightenedChild(n, va, vb, MAX_CABLE, nodeMap, q, closed, reopen, solutionLog)
 	solutionLog.expanded = count
 	solutionLog.genereted = len(nodeMap)
 	solutionLog.setEndTime()
 	return solutionLog
 
+def _addTightenedChild(n: Node, va, vb, MAX_CABLE: int, nodeMap, q, closed, reopen, solutionLog) -> None:
+	# For now I deliberately avoid cross movement because it crashes the triangulation
+	# In reality we can fix this by mirorring the space (like I did in the previous paper)
+	if isThereCrossMovement(n.cable, va, vb): return
+	newCable = None
+	# FIXME: Defensively ignoring exceptions
+	try:
+		newCable = tightenCable(n.cable, va, vb)
+	except:
+		return
+	l = Geom.lengthOfCurve(newCable)
+	if l <= MAX_CABLE:
+		addChildNode(newCable, n, nodeMap, q, False, closed=closed, reopen=reopen, solutionLog=solutionLog)
+
 def isUndoingLastMove(node, v, index):
 	if not node.parent: return False
 	if v.name == "D1" or v.name == "D2": return False
 	if convertToPoint(node.parent.cable[index]) != convertToPoint(v): return False
-	path = node._getPath(index  == 0)
-	path = removeRepeatedVertsOrdered(path)
 	if convertToPoint(node.parent.cable[-2]) != convertToPoint(v): return False
 	return True
 
@@ -242,17 +340,14 @@ def isAtDestination(n) -> bool:
 	if not n: return False
 	return convertToPoint(n.cable[0]) == convertToPoint(model.robots[0].destination) and convertToPoint(n.cable[-1]) == convertToPoint(model.robots[1].destination)
 
-def getCableId(cable, fractions) -> str:
-	# return "%s-[%.6f, %.6f]" % (repr(cable), fractions[0], fractions[1])
-	return repr(cable)
-
-def addChildNode(newCable, parent, nodeMap, pQ, debug, fractions=[1, 1]) -> None:
-	cableStr = getCableId(newCable, fractions)
-	if cableStr in nodeMap:
-		nodeMap[cableStr].updateParent(parent)
-		if debug: logger.log("UPDATE %s @ %s" % (repr(nodeMap[cableStr].f), cableStr))
+def addChildNode(newCable, parent, nodeMap, pQ, debug, fractions=[1, 1], closed=frozenset(), reopen=REOPEN_NEVER, solutionLog=None) -> None:
+	cableKey = getCableKey(newCable, fractions)
+	if cableKey in closed and reopen == REOPEN_NEVER: return
+	if cableKey in nodeMap:
+		updateExistingNode(nodeMap[cableKey], parent, cableKey, pQ, closed, reopen, solutionLog)
+		if debug: logger.log("UPDATE %s @ %s" % (repr(nodeMap[cableKey].f), repr(newCable)))
 	else:
 		child = Node(cable=newCable, parent=parent, debug=parent.debug, heuristicFuncName="_heuristicShortestPath")
-		if debug: logger.log("ADDING %s @ %s" % (repr(child.f), cableStr))
-		nodeMap[cableStr] = child
+		if debug: logger.log("ADDING %s @ %s" % (repr(child.f), repr(newCable)))
+		nodeMap[cableKey] = child
 		pQ.enqueue(child)
@@ -0,0 +1,76 @@
+"""
+Tightens the children of a node in a pool of worker processes.
+
+Each worker loads its own copy of the preset once, when it starts. Vertices are sent back and forth by name
+(names are unique within a preset), so only the pairs of moves and the tightened cables cross the process boundary.
+"""
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+from algorithm.cable import tightenCable
+from model.modelService import Model
+
+model = Model()
+
+def initWorker(presetPath: str, options: dict, maxCable: float) -> None:
+	"""
+	The initializer of the worker processes of a pool (also used by `dynamicProg()`): loads a copy of the preset and the cable length
+	"""
+	# Imported here since the preset module depends on most of the algorithm package
+	from model.preset import Preset
+	# The main process already logs the search, the workers would only repeat the preset loading messages
+	logging.disable(logging.CRITICAL)
+	Preset(presetPath, **options)
+	model.setMaxCable(maxCable)
+
+def _tightenPairs(cableNames: list, pairNames: list) -> list:
+	"""
+	Returns
+	===
+	A list with the names of the vertices of each tightened cable, or `None` where `tightenCable()` failed
+	"""
+	cable = [model.entities[name] for name in cableNames]
+	results = []
+	for (vaName, vbName) in pairNames:
+		try:
+			tight = tightenCable(cable, model.entities[vaName], model.entities[vbName])
+			results.append([v.name for v in tight])
+		except Exception:
+			results.append(None)
+	return results
+
+class ParallelExpander(object):
+	def __init__(self, workers: int):
+		"""
+		Starts `workers` processes, each holding a copy of the preset that populated the model (see `Model.preset`)
+		"""
+		if not model.preset: raise RuntimeError("Parallel expansion needs a model that was loaded from a preset")
+		self.workers = workers
+		self._executor = ProcessPoolExecutor(max_workers=workers, initializer=initWorker, initargs=(model.preset.path, model.preset.options, model.MAX_CABLE))
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.shutdown()
+
+	def shutdown(self) -> None:
+		self._executor.shutdown()
+
+	def tightenAll(self, cable: list, pairs: list) -> list:
+		"""
+		The parallel equivalent of calling `tightenCable(cable, va, vb)` for each pair, the pairs are split evenly between the workers.
+
+		Returns
+		===
+		A list with the tightened cable of each pair (in order), or `None` where tightening failed
+		"""
+		if not pairs: return []
+		cableNames = [v.name for v in cable]
+		pairNames = [(va.name, vb.name) for (va, vb) in pairs]
+		chunkSize = -(-len(pairNames) // self.workers)
+		chunks = [pairNames[i:i + chunkSize] for i in range(0, len(pairNames), chunkSize)]
+		results = []
+		for chunk in self._executor.map(_tightenPairs, [cableNames] * len(chunks), chunks):
+			results.extend(chunk)
+		return [[model.entities[name] for name in names] if names else None for names in results]
@@ -0,0 +1,153 @@
+"""
+Rotational sweep (Lee's algorithm, see Asano et al. 1986) for computing the vertices visible from a source vertex.
+
+For each source, the other vertices are sorted by angle around the source and a ray is swept around it.
+The obstacle edges crossed by the ray are kept ordered by their distance from the source,
+so a vertex is visible if none of the edges in front of it blocks it.
+
+Every blocking decision is made with `Geom.isBlockedBy()`, the same rule the all-pairs engine uses,
+the sweep only decides which edges need to be tested. Angles are compared with cross products (no `atan2`)
+so collinear vertices are grouped exactly for integer coordinates.
+"""
+from functools import cmp_to_key
+
+import utils.cgal.geometry as Geom
+from model.modelService import Model
+from utils.cgal.types import Segment
+from utils.vertexUtils import convertToPoint
+
+model = Model()
+
+_INSERT = 0
+_QUERY = 1
+_REMOVE = 2
+
+class _Edge(object):
+	def __init__(self, segment: Segment):
+		self.segment = segment
+		(src, tgt) = (segment.source(), segment.target())
+		(self.ax, self.ay, self.bx, self.by) = (src.x(), src.y(), tgt.x(), tgt.y())
+
+	def orient(self, x, y) -> float:
+		"""
+		The sign shows which side of the supporting line of this edge (x, y) is on
+		"""
+		return (self.bx - self.ax) * (y - self.ay) - (self.by - self.ay) * (x - self.ax)
+
+def getObstacleEdges() -> list:
+	return [_Edge(edge) for o in model.obstacles for edge in o.polygon.edges()]
+
+def _half(dx, dy) -> int:
+	return 0 if dy > 0 or (dy == 0 and dx > 0) else 1
+
+def _compareAngles(d1, d2) -> int:
+	"""
+	Counter-clockwise order of two direction vectors (as tuples) starting from the positive x axis
+	"""
+	(h1, h2) = (_half(*d1), _half(*d2))
+	if h1 != h2: return h1 - h2
+	cross = d1[0] * d2[1] - d1[1] * d2[0]
+	if cross > 0: return -1
+	if cross < 0: return 1
+	return 0
+
+def _isCloser(e: _Edge, f: _Edge, vx, vy) -> bool:
+	"""
+	Given two non-crossing edges that are both hit by the same ray from (vx, vy), whether e is hit first
+	"""
+	sv = f.orient(vx, vy)
+	s1 = f.orient(e.ax, e.ay) * sv
+	s2 = f.orient(e.bx, e.by) * sv
+	if s1 >= 0 and s2 >= 0 and (s1 > 0 or s2 > 0): return True
+	if s1 <= 0 and s2 <= 0 and (s1 < 0 or s2 < 0): return False
+	if s1 == 0 and s2 == 0: return False
+	# e straddles the line of f, so f cannot straddle the line of e
+	se = e.orient(vx, vy)
+	t1 = e.orient(f.ax, f.ay) * se
+	t2 = e.orient(f.bx, f.by) * se
+	return not (t1 >= 0 and t2 >= 0)
+
+def _insert(active: list, e: _Edge, vx, vy) -> None:
+	lo = 0
+	hi = len(active)
+	while lo < hi:
+		mid = (lo + hi) // 2
+		if _isCloser(active[mid], e, vx, vy): lo = mid + 1
+		else: hi = mid
+	active.insert(lo, e)
+
+def _createEvents(vx, vy, edges: list, targets: list) -> tuple:
+	"""
+	Returns a tuple of the initially active edges and the list of events (direction, kind, payload)
+
+	Edges that are collinear with the source are registered as `_INSERT` and `_REMOVE` at the same angle.
+	"""
+	initial = []
+	events = []
+	for e in edges:
+		(da, db) = ((e.ax - vx, e.ay - vy), (e.bx - vx, e.by - vy))
+		cross = da[0] * db[1] - da[1] * db[0]
+		if cross == 0:
+			# Collinear with the source. If the source is on the edge, the edge can't block anything.
+			if da[0] * db[0] + da[1] * db[1] <= 0: continue
+			events.append((da, _INSERT, e))
+			events.append((da, _REMOVE, e))
+			continue
+		(first, last) = (da, db) if cross > 0 else (db, da)
+		if _compareAngles(first, last) > 0:
+			# The edge crosses the positive x axis where the sweep starts
+			initial.append(e)
+		events.append((first, _INSERT, e))
+		events.append((last, _REMOVE, e))
+	for (v, x, y) in targets:
+		if x == vx and y == vy: continue
+		events.append(((x - vx, y - vy), _QUERY, v))
+	return (initial, events)
+
+def getVisibleVertices(src, targets: list, edges: list) -> set:
+	"""
+	Params
+	===
+	src: The Vertex to sweep around
+
+	targets: A list of Vertex
+
+	edges: Obstacle edges obtained from `getObstacleEdges()`
+	"""
+	srcPt = convertToPoint(src)
+	(vx, vy) = (srcPt.x(), srcPt.y())
+	targets = [(v, convertToPoint(v).x(), convertToPoint(v).y()) for v in targets]
+	(initial, events) = _createEvents(vx, vy, edges, targets)
+	active = []
+	for e in initial: _insert(active, e, vx, vy)
+	events.sort(key=cmp_to_key(lambda ev1, ev2: _compareAngles(ev1[0], ev2[0]) or (ev1[1] - ev2[1])))
+	visible = set()
+	i = 0
+	while i < len(events):
+		# Process all events at the same angle: inserts, then queries, then removals
+		j = i
+		while j < len(events) and _compareAngles(events[i][0], events[j][0]) == 0: j += 1
+		group = events[i:j]
+		rayEdges = []
+		for (d, kind, e) in group:
+			if kind != _INSERT: continue
+			if (e.ax - vx) * (e.by - vy) - (e.ay - vy) * (e.bx - vx) == 0: rayEdges.append(e)
+			else: _insert(active, e, vx, vy)
+		for (d, kind, v) in group:
+			if kind == _QUERY and _isVisibleInSweep(srcPt, vx, vy, convertToPoint(v), active, rayEdges):
+				visible.add(v)
+		for (d, kind, e) in group:
+			if kind == _REMOVE and e not in rayEdges: active.remove(e)
+		i = j
+	return visible
+
+def _isVisibleInSweep(srcPt, vx, vy, targetPt, active: list, rayEdges: list) -> bool:
+	(wx, wy) = (targetPt.x(), targetPt.y())
+	l = Segment(srcPt, targetPt)
+	for e in rayEdges:
+		if Geom.isBlockedBy(l, e.segment, srcPt, targetPt): return False
+	for e in active:
+		# The target is strictly in front of this edge and therefore in front of every edge after it
+		if e.orient(vx, vy) * e.orient(wx, wy) > 0: break
+		if Geom.isBlockedBy(l, e.segment, srcPt, targetPt): return False
+	return True
@@ -17,6 +17,15 @@ class SolutionLog:
 		self.expanded = 0
 		self.genereted = 0
 		self.heuristic = heuristic
+		self.tightenHits = 0 # Calls to tightenCable() answered by the memo
+		self.tightenMisses = 0
+		self.reexpanded = 0 # Expansions of configurations that were already expanded
+		self.reopened = 0 # Expanded configurations queued again after finding a better parent
+		self.tightenCalls = 0 # Children the search tightened
+		self.tightenSkipped = 0 # Children the lazy search queued but never had to tighten
+		self.lengthPruned = 0 # Moves discarded by the length lower bound, each one saves a cross movement test and usually a tighten call
+		self.heuristicTimes = {} # Heuristic function name -> seconds spent in it (including nested searches)
+		self.heuristicCalls = {} # Heuristic function name -> number of calls
 		self._startTime = timer()
 		self._endTime = -1.0
 		self._time = -1
@@ -32,6 +41,17 @@ class SolutionLog:
 		self._endTime = timer()
 		self._content = value
 
+	def setTightenStats(self, memo: "LruCache", start: tuple) -> None:
+		"""
+		start: The (hits, misses) of the memo when the search started
+		"""
+		self.tightenHits = memo.hits - start[0]
+		self.tightenMisses = memo.misses - start[1]
+
+	def addHeuristicTime(self, heuristic: str, seconds: float) -> None:
+		self.heuristicTimes[heuristic] = self.heuristicTimes.get(heuristic, 0) + seconds
+		self.heuristicCalls[heuristic] = self.heuristicCalls.get(heuristic, 0) + 1
+
 	def setEndTime(self):
 		if self._endTime< 0:
 			self._endTime = timer()
@@ -152,12 +152,12 @@ class Triangulation(object):
 		# because of that the IDs might be off by an epsilon
 		# FIXME: Might be unnecessary now that we have polygon intersection
 		# vrt = Geom.getClosestVertex(pt)
-		# key = VertexUtils.ptToStringId(vrt) if vrt else VertexUtils.ptToStringId(pt)
-		key = VertexUtils.ptToStringId(pt)
+		# key = VertexUtils.ptToKey(vrt) if vrt else VertexUtils.ptToKey(pt)
+		key = VertexUtils.ptToKey(pt)
 		self._ptHandles[key] = handle
 
 	def _isPtHandleInDict(self, pt) -> bool:
-		key = VertexUtils.ptToStringId(pt)
+		key = VertexUtils.ptToKey(pt)
 		return key in self._ptHandles
 
 	def _markInteriorTriangles(self):
@@ -210,7 +210,7 @@ class Triangulation(object):
 					queue.append(neighboringFace)
 
 	def _addCanvasEdge(self, segment, canvasEdge):
-		pts = frozenset([VertexUtils.ptToStringId(segment.source()), VertexUtils.ptToStringId(segment.target())])
+		pts = frozenset([VertexUtils.ptToKey(segment.source()), VertexUtils.ptToKey(segment.target())])
 		self._canvasEdges[pts] = canvasEdge
 		model.entities[canvasEdge.name] = canvasEdge
 
@@ -320,7 +320,7 @@ class Triangulation(object):
 		vertex: model.vertex.Vertex or utils.cgal.types.Point
 		"""
 		# See _insertHandleIntoDict()
-		key = VertexUtils.ptToStringId(vertex)
+		key = VertexUtils.ptToKey(vertex)
 		return self._ptHandles.get(key)
 
 	def getIncidentTriangles(self, vertexSet):
@@ -402,7 +402,7 @@ class Triangulation(object):
 				self._addCanvasEdge(segment, canvasE)
 
 	def getCanvasEdge(self, vertexSet):
-		pts = frozenset([VertexUtils.ptToStringId(VertexUtils.convertToPoint(vert)) for vert in vertexSet])
+		pts = frozenset([VertexUtils.ptToKey(VertexUtils.convertToPoint(vert)) for vert in vertexSet])
 		return self._canvasEdges[pts]
 
 	def eraseDrawnEdges(self):
@@ -4,10 +4,14 @@ from model.debugEdge import DebugEdge
 from model.robot import Robot
 from utils.cgal.types import Ray, Segment, intersection
 from utils.vertexUtils import convertToPoint
+from algorithm.rotationalSweep import getObstacleEdges, getVisibleVertices
 
 
 model = Model()
 
+ENGINE_ALL_PAIRS = "allPairs"
+ENGINE_SWEEP = "sweep"
+
 class LabeledVert(object):
 	def __init__(self, vertex, robot):
 		self.vrt = vertex
@@ -16,25 +20,20 @@ class LabeledVert(object):
 	def __repr__(self):
 		return "<%s, %s>" % (self.vrt.name, self.rbt.name)
 
-def processReducedVisibilityGraph(debug=False) -> None:
+def processReducedVisibilityGraph(debug=False, engine=ENGINE_ALL_PAIRS) -> None:
 	"""
 	Note that reduced visibility graph is unidirectional. That is, there might be and edge v -> u but not the other way around
+
+	engine: `ENGINE_ALL_PAIRS` checks the visibility of every pair against the obstacles.
+	`ENGINE_SWEEP` finds the visible vertices of each vertex with one rotational sweep. Both yield the same gaps.
 	"""
+	if engine not in [ENGINE_ALL_PAIRS, ENGINE_SWEEP]:
+		raise ValueError("Unknown visibility engine %s" % engine)
+	edges = getObstacleEdges() if engine == ENGINE_SWEEP else None
 	for v in model.allVertexObjects:
+		visible = getVisibleVertices(v, model.allVertexObjects, edges) if engine == ENGINE_SWEEP else None
 		for u in model.allVertexObjects:
-			if v.name == u.name and (v.name == "D1" or v.name == "D2"):
-				v.gaps.add(u)
-				continue
-			if v.loc == u.loc:
-				# v.gaps.add(u)
-				continue
-			# The below 2 edge cases rarely happen, but it happens when the robot or destination are exactly at a vertex of an obstacle
-			if _isRobotOrDestinationAndOnObstacleButNotAdjacent(v, u): continue
-			if _isRobotOrDestinationAndOnObstacleButNotAdjacent(u, v): continue
-
-			# If they belong to the same obstacle but are not adjacent, they aren't u is not visible
-			if v.ownerObs and u.ownerObs and v.ownerObs.name == u.ownerObs.name and u not in v.adjacentOnObstacle: continue
-			if _isGap(v, u):
+			if _isEdge(v, u, visible):
 				v.gaps.add(u)
 
 	if not debug: return
@@ -47,6 +46,91 @@ def processReducedVisibilityGraph(debug=False) -> None:
 			counter += 1
 	print("Edges: %d" % counter)
 
+def updateVertexGaps(vert, removed=None) -> None:
+	"""
+	Updates the reduced visibility graph for one vertex instead of processing every pair again:
+	`removed` (a vertex that is no longer in the model) is dropped from every gap set, then the gaps from and to `vert` are checked.
+	Used when a destination moves (see `algorithm.incremental.moveDestination()`).
+	"""
+	vert.gaps = set()
+	for v in model.allVertexObjects:
+		if removed: v.gaps.discard(removed)
+		if v is vert: continue
+		v.gaps.discard(vert)
+		if _isEdge(v, vert): v.gaps.add(vert)
+	for u in model.allVertexObjects:
+		if _isEdge(vert, u): vert.gaps.add(u)
+
+def updateGapsInBoxes(addedBoxes=[], removedBoxes=[], added=[], removed=[]) -> int:
+	"""
+	Updates the reduced visibility graph after obstacles were added inside `addedBoxes` or removed from `removedBoxes`
+	(each box is xMin, yMin, xMax, yMax), instead of processing every pair again. Every pair is checked against the current obstacles.
+	A removed obstacle only unblocks segments, so the pairs whose segment crosses its box are checked again.
+	An added obstacle only blocks segments, so besides the pairs of its vertices only the edges that cross its box are checked again.
+	Used by `Model.addObstacle()`, `Model.removeObstacle()` and `Model.moveObstacle()`.
+
+	Params
+	===
+	added: The vertices of the added obstacles, already registered in the model
+
+	removed: The vertices of the removed obstacles, no longer in the model
+
+	Returns
+	===
+	The number of pairs that were checked again
+	"""
+	removed = set(removed)
+	verts = model.allVertexObjects
+	for v in verts:
+		v.gaps -= removed
+	index = {v: i for (i, v) in enumerate(verts)}
+	coords = [(pt.x(), pt.y()) for pt in [convertToPoint(v) for v in verts]]
+	pairs = set()
+	for v in added:
+		i = index[v]
+		pairs.update([(min(i, j), max(i, j)) for j in range(len(verts)) if j != i])
+	for box in removedBoxes:
+		for (i, (x1, y1)) in enumerate(coords):
+			for j in range(i + 1, len(verts)):
+				if _mayCrossBox(x1, y1, *coords[j], box) and Geom.segmentIntersectsBox(verts[i], verts[j], box): pairs.add((i, j))
+	for box in addedBoxes:
+		for (i, v) in enumerate(verts):
+			for u in v.gaps:
+				j = index.get(u, i)
+				if j == i: continue
+				pair = (min(i, j), max(i, j))
+				if pair in pairs: continue
+				if _mayCrossBox(*coords[i], *coords[j], box) and Geom.segmentIntersectsBox(v, u, box): pairs.add(pair)
+	for (i, j) in pairs:
+		(v, u) = (verts[i], verts[j])
+		for (src, target) in [(v, u), (u, v)]:
+			if _isEdge(src, target):
+				src.gaps.add(target)
+			else:
+				src.gaps.discard(target)
+	return len(pairs)
+
+def _mayCrossBox(x1, y1, x2, y2, box: tuple) -> bool:
+	"""
+	Cheap rejection before `Geom.segmentIntersectsBox()`: whether the bounding box of the segment overlaps the box
+	"""
+	return max(x1, x2) >= box[0] and min(x1, x2) <= box[2] and max(y1, y2) >= box[1] and min(y1, y2) <= box[3]
+
+def _isEdge(v, u, visible: set = None) -> bool:
+	"""
+	Whether the reduced visibility graph has the edge v -> u
+
+	visible: The precomputed set of vertices visible from `v`, see `_isGap()`
+	"""
+	if v.name == u.name and (v.name == "D1" or v.name == "D2"): return True
+	if v.loc == u.loc: return False
+	# The below 2 edge cases rarely happen, but it happens when the robot or destination are exactly at a vertex of an obstacle
+	if _isRobotOrDestinationAndOnObstacleButNotAdjacent(v, u): return False
+	if _isRobotOrDestinationAndOnObstacleButNotAdjacent(u, v): return False
+	# If they belong to the same obstacle but are not adjacent, they aren't u is not visible
+	if v.ownerObs and u.ownerObs and v.ownerObs.name == u.ownerObs.name and u not in v.adjacentOnObstacle: return False
+	return _isGap(v, u, visible)
+
 def _isRobotOrDestinationAndOnObstacleButNotAdjacent(candidate, obstacleVert):
 	# FIXME: This is buggy:
 	# What if candidate is a robot but obstacleVert is also a robot that happens to be on the same obstacle but are not adjacent
@@ -62,8 +146,13 @@ def _isRobotOrDestinationAndOnObstacleButNotAdjacent(candidate, obstacleVert):
 	if obstacleVert.ownerObs.areAdjacent(candidate, obstacleVert): return False
 	return True
 
-def _isGap(src, target) -> bool:
-	if not src.isVisible(target):
+def _isGap(src, target, visible: set = None) -> bool:
+	"""
+	visible: The precomputed set of vertices visible from `src`. If `None`, visibility is checked directly.
+	"""
+	if visible is None and not src.isVisible(target):
+		return False
+	if visible is not None and target not in visible:
 		return False
 	# Detecting whether u is a gap for v
 	epsilon = Geom.getEpsilonVector(src, target)
@@ -0,0 +1,175 @@
+"""
+A constrained triangulation of the whole workspace that is built once per preset.
+
+Instead of triangulating the region around each cable, the sleeve of a cable is extracted by walking the cable
+through this fixed mesh and discarding the triangles where it backtracks, as in
+"Hershberger, J., & Snoeyink, J. (1994). Computing minimum length paths of a given homotopy class."
+The shortest path through the sleeve is then found with the funnel algorithm over the portals (shared edges) of the sleeve.
+
+https://doi.org/10.1016/0925-7721(94)90010-8
+"""
+import utils.vertexUtils as VertexUtils
+from algorithm.triangulation import Triangulation
+from model.modelService import Model
+from utils.cgal.types import CgalTriangulation, Point, TriangulationFaceHandle
+
+model = Model()
+
+BOUNDARY_MARGIN = 50 # in pixels
+# Offset (as a fraction of the segment) used to find the faces right after the start and right before the end of a segment
+WALK_OFFSET = 1e-7
+
+class WorkspaceTriangulation(Triangulation):
+	def __init__(self, debug=False):
+		"""
+		Triangulates the bounding box of the model with every obstacle as a hole.
+
+		The robots and destinations are deliberately not vertices of the mesh:
+		they are usually in the middle of the cable and walking the cable exactly through a vertex is degenerate.
+
+		It shares the face and edge queries of `Triangulation`.
+		"""
+		self.faceInfoMap = {}
+		self.debug = debug
+		self._ptHandles = {}
+		self._canvasEdges = {}
+		# The bends of a tightened cable are always obstacle vertices of the mesh
+		self.obstacleVertices = {(v.loc.x(), v.loc.y()): v for o in model.obstacles for v in o.vertices}
+		self.boundaryPts = self._getBoundingBox()
+		self.cgalTri = CgalTriangulation()
+		self._insertPolygonIntoTriangulation(self.boundaryPts)
+		for o in model.obstacles:
+			self._insertPolygonIntoTriangulation(list(o.polygon.vertices()))
+		self._markInteriorTriangles()
+		self.triangleCount = 0
+		self._countTriangles()
+		if debug:
+			self.drawEdges()
+
+	def _getBoundingBox(self) -> list:
+		pts = [VertexUtils.convertToPoint(v) for v in model.allVertexObjects]
+		xs = [pt.x() for pt in pts]
+		ys = [pt.y() for pt in pts]
+		(xMin, yMin) = (min(xs) - BOUNDARY_MARGIN, min(ys) - BOUNDARY_MARGIN)
+		(xMax, yMax) = (max(xs) + BOUNDARY_MARGIN, max(ys) + BOUNDARY_MARGIN)
+		return [Point(xMin, yMin), Point(xMax, yMin), Point(xMax, yMax), Point(xMin, yMax)]
+
+	def _filterNonDomainTriangle(self, face: TriangulationFaceHandle):
+		return self.faceInfoMap[face].inDomain()
+
+	def _faceContains(self, face: TriangulationFaceHandle, x, y) -> bool:
+		"""
+		Whether (x, y) is inside or on the boundary of the face
+		"""
+		if self.cgalTri.is_infinite(face): return False
+		pts = [face.vertex(i).point() for i in range(3)]
+		signs = []
+		for i in range(3):
+			(a, b) = (pts[i], pts[(i + 1) % 3])
+			signs.append((b.x() - a.x()) * (y - a.y()) - (b.y() - a.y()) * (x - a.x()))
+		return not (min(signs) < 0 and max(signs) > 0)
+
+	def _walkSegment(self, src: Point, dst: Point) -> list:
+		"""
+		Returns the faces crossed by the segment src -> dst, in order, or `None` if the walk fails
+		"""
+		(dx, dy) = (dst.x() - src.x(), dst.y() - src.y())
+		(startX, startY) = (src.x() + dx * WALK_OFFSET, src.y() + dy * WALK_OFFSET)
+		(endX, endY) = (dst.x() - dx * WALK_OFFSET, dst.y() - dy * WALK_OFFSET)
+		circulator = self.cgalTri.line_walk(src, dst)
+		# The circulator goes around the whole line, so it visits every face at most twice before we give up
+		maxSteps = 2 * self.cgalTri.number_of_faces() + 2
+		faces = []
+		for _ in range(maxSteps):
+			if not circulator.hasNext(): return None
+			face = circulator.next()
+			if not faces and not self._faceContains(face, startX, startY): continue
+			faces.append(face)
+			if self._faceContains(face, endX, endY): return faces
+		return None
+
+	def getSleeve(self, polyline: list) -> list:
+		"""
+		Walks the polyline (Vertex or Point) through the mesh and returns the sleeve: the sequence of faces where no face is immediately revisited.
+
+		Returns `None` if the polyline leaves the free space or the faces do not form a chain of neighbors (e.g. the polyline passes exactly through a vertex).
+		"""
+		pts = [VertexUtils.convertToPoint(v) for v in polyline]
+		sleeve = []
+		for i in range(len(pts) - 1):
+			faces = self._walkSegment(pts[i], pts[i + 1])
+			if not faces: return None
+			for face in faces:
+				if not self._filterNonDomainTriangle(face): return None
+				if sleeve and sleeve[-1] == face: continue
+				# Backtracking into the previous face cancels both
+				if len(sleeve) > 1 and sleeve[-2] == face:
+					sleeve.pop()
+					continue
+				sleeve.append(face)
+		for i in range(len(sleeve) - 1):
+			if not self.areTrianglesNeighbor(sleeve[i], sleeve[i + 1]): return None
+		return sleeve
+
+	def _getPortals(self, sleeve: list) -> list:
+		"""
+		Returns the shared edge of each pair of consecutive faces as a tuple (left, right), as seen when walking along the sleeve
+		"""
+		portals = []
+		for i in range(len(sleeve) - 1):
+			(p, q) = list(self.getCommonEdge(sleeve[i], sleeve[i + 1]))
+			opposite = next(pt for pt in [sleeve[i].vertex(j).point() for j in range(3)] if pt != p and pt != q)
+			mid = Point((p.x() + q.x()) / 2, (p.y() + q.y()) / 2)
+			portals.append((p, q) if _cross(opposite, mid, p) > 0 else (q, p))
+		return portals
+
+	def getShortestPath(self, src, dst, sleeve: list) -> list:
+		"""
+		The funnel algorithm (in its "string pulling" form) from `src` in the first face of the sleeve to `dst` in the last one
+
+		Returns
+		===
+		The list of Points on the shortest path, including `src` and `dst`. The points in between are vertices of the mesh.
+		"""
+		src = VertexUtils.convertToPoint(src)
+		dst = VertexUtils.convertToPoint(dst)
+		portals = [(src, src)] + self._getPortals(sleeve) + [(dst, dst)]
+		path = [src]
+		(apex, left, right) = (src, src, src)
+		(apexIndex, leftIndex, rightIndex) = (0, 0, 0)
+		i = 1
+		while i < len(portals):
+			(portalLeft, portalRight) = portals[i]
+			# Tighten the right side of the funnel
+			if _cross(apex, right, portalRight) >= 0:
+				if apex == right or _cross(apex, left, portalRight) < 0:
+					(right, rightIndex) = (portalRight, i)
+				else:
+					# The right side crossed over the left side, so the left side becomes the new apex
+					path.append(left)
+					(apex, apexIndex) = (left, leftIndex)
+					(left, right, leftIndex, rightIndex) = (apex, apex, apexIndex, apexIndex)
+					i = apexIndex + 1
+					continue
+			# Tighten the left side of the funnel
+			if _cross(apex, left, portalLeft) <= 0:
+				if apex == left or _cross(apex, right, portalLeft) > 0:
+					(left, leftIndex) = (portalLeft, i)
+				else:
+					path.append(right)
+					(apex, apexIndex) = (right, rightIndex)
+					(left, right, leftIndex, rightIndex) = (apex, apex, apexIndex, apexIndex)
+					i = apexIndex + 1
+					continue
+			i += 1
+		if path[-1] != dst: path.append(dst)
+		return path
+
+	def getObstacleVertex(self, pt: Point):
+		return self.obstacleVertices.get((pt.x(), pt.y()))
+
+def _cross(a: Point, b: Point, c: Point) -> float:
+	"""
+	Positive if c is to the left of a -> b (counter-clockwise in a y-up coordinate system)
+	"""
+	return (b.x() - a.x()) * (c.y() - a.y()) - (b.y() - a.y()) * (c.x() - a.x())
@@ -0,0 +1,34 @@
+"""
+Compares the DP with and without the tables its subproblems share (see `DpTables`): the tightened children of each configuration
+and the solutions that also hold for the subproblems that keep more of the cable.
+Runs on the presets the DP solves in seconds only (`aStar1`, `aStarDp-*` and `scenario-2` take from minutes to hours).
+"""
+import csv
+import os
+
+from algorithm.dp import dynamicProg
+from model.preset import Preset
+from utils.logger import Logger
+
+logger = Logger()
+HEURISTIC = "_heuristicShortestPath"
+PRESETS = ["1.json", "10.json", "12.json", "aStar2.json", "aStar3.json", "scenario-1.json", "scenario-3.json", "scenario-4.json", "scenario-5.json", "scenario-6.json"]
+
+csvData = [["PRESET", "ALGORITHM", "EXPANDED", "GENERATED", "TIME", "COST-MAX", "COST-MIN"]]
+
+def main():
+	presetsDir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "presets"))
+	for presetName in PRESETS:
+		for (algorithm, shareTables) in [("DP", False), ("DP (shared tables)", True)]:
+			Preset(os.path.join(presetsDir, presetName))
+			solution = dynamicProg(HEURISTIC, shareTables=shareTables)
+			cost = solution.content.cost if solution.content else None
+			csvData.append([presetName, algorithm, solution.expanded, solution.genereted, solution.time, cost.max()[0] if cost else "", cost.min()[0] if cost else ""])
+			logger.log("%s (%s): %d expanded, %d generated in %.2fs, cost = %s" % (presetName, algorithm, solution.expanded, solution.genereted, solution.time, repr(cost)))
+	with open(logger.logFileName.replace(".log", "-dpTables.csv"), "w", newline="") as csvFile:
+		csvWriter = csv.writer(csvFile, quoting=csv.QUOTE_ALL)
+		for row in csvData:
+			csvWriter.writerow(row)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,70 @@
+"""
+Compares the local update of the visibility graph when one obstacle is added, moved or removed (see `Model.addObstacle()`)
+with processing every pair again, on synthetic presets of growing size (see `createRandomPreset()`).
+Both include the invalidation of the caches that depend on the obstacles. The full rebuild runs on the updated model,
+so the two graphs are also compared.
+"""
+import csv
+import os
+from timeit import default_timer as timer
+
+from algorithm.visibility import processReducedVisibilityGraph
+from experiments.randomMap import createRandomPreset, CELL, MARGIN
+from model.modelService import Model
+from model.preset import Preset
+from utils.cgal.types import Point
+from utils.logger import Logger
+
+logger = Logger()
+model = Model()
+SIZES = [9, 25, 49, 100]
+ADDED_SIZE = 10
+
+csvData = [["OBSTACLES", "CHANGE", "TIME", "FULL-REBUILD-TIME", "SAME-GAPS"]]
+
+def _getGaps() -> dict:
+	return {v: set(v.gaps) for v in model.allVertexObjects}
+
+def _rebuild(engine: str) -> float:
+	start = timer()
+	for v in model.allVertexObjects:
+		v.gaps = set()
+	processReducedVisibilityGraph(engine=engine)
+	model.invalidateObstacleCaches()
+	return timer() - start
+
+def _measure(size: int, change: str, func, engine: str) -> None:
+	start = timer()
+	func()
+	elapsed = timer() - start
+	gaps = _getGaps()
+	fullTime = _rebuild(engine)
+	same = gaps == _getGaps()
+	csvData.append([size, change, elapsed, fullTime, same])
+	logger.log("%d obstacles, %s: %.4fs, full rebuild %.4fs, same gaps = %s" % (size, change, elapsed, fullTime, same))
+
+def main():
+	for size in SIZES:
+		path = createRandomPreset(size)
+		try:
+			preset = Preset(path, useCache=False)
+		finally:
+			os.remove(path)
+		cols = 1
+		while cols * cols < size: cols += 1
+		middle = (cols // 2) * cols + cols // 2
+		# In the free band between the obstacles of the middle cell and the next ones
+		(x, y) = (MARGIN + (cols // 2) * CELL + 42, MARGIN + (cols // 2) * CELL + 42)
+		pts = [Point(x, y), Point(x + ADDED_SIZE, y), Point(x + ADDED_SIZE, y + ADDED_SIZE), Point(x, y + ADDED_SIZE)]
+		# The model forgets its preset once the obstacles change
+		engine = preset.visibilityEngine
+		_measure(size, "add", lambda: model.addObstacle(pts), engine)
+		_measure(size, "move", lambda: model.moveObstacle("O%d" % middle, 5, 5), engine)
+		_measure(size, "remove", lambda: model.removeObstacle("O%d" % middle), engine)
+	with open(logger.logFileName.replace(".log", "-dynamicObstacles.csv"), "w", newline="") as csvFile:
+		csvWriter = csv.writer(csvFile, quoting=csv.QUOTE_ALL)
+		for row in csvData:
+			csvWriter.writerow(row)
+
+if __name__ == '__main__':
+	main()
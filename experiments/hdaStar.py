@@ -0,0 +1,39 @@
+"""
+Compares the serial A* with HDA* for a growing number of workers on the scenario presets
+"""
+import csv
+import glob
+import os
+
+from algorithm.aStar import aStar
+from algorithm.hdaStar import hdaStar
+from model.preset import Preset
+from utils.logger import Logger
+
+logger = Logger()
+HEURISTIC = "_heuristicShortestPath"
+WORKERS = [1, 2, 4]
+
+csvData = [["PRESET", "WORKERS", "EXPANDED", "GENERATED", "COST-MAX", "TIME"]]
+
+def _record(presetName, workers, solution) -> None:
+	costMax = solution.content.cost.max()[0] if solution.content else ""
+	csvData.append([presetName, workers, solution.expanded, solution.genereted, costMax, solution.time])
+	logger.log("%s (%s workers): %d expanded in %.2fs" % (presetName, workers, solution.expanded, solution.time))
+
+def main():
+	presetsDir = os.path.join(os.path.dirname(__file__), "..", "presets")
+	for mapPath in sorted(glob.glob(os.path.join(os.path.abspath(presetsDir), "scenario-*.json"))):
+		presetName = os.path.basename(mapPath)
+		Preset(mapPath)
+		_record(presetName, 0, aStar(HEURISTIC))
+		for workers in WORKERS:
+			Preset(mapPath)
+			_record(presetName, workers, hdaStar(HEURISTIC, workers=workers))
+	with open(logger.logFileName.replace(".log", "-hdaStar.csv"), "w", newline="") as csvFile:
+		csvWriter = csv.writer(csvFile, quoting=csv.QUOTE_ALL)
+		for row in csvData:
+			csvWriter.writerow(row)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,35 @@
+"""
+Tighten calls saved by the lazy A* (children tightened only when dequeued) compared with the eager one, on the scenario presets
+"""
+import csv
+import glob
+import os
+
+from algorithm.aStar import aStar
+from model.preset import Preset
+from utils.logger import Logger
+
+logger = Logger()
+HEURISTIC = "_heuristicShortestPath"
+
+csvData = [["PRESET", "LAZY", "EXPANDED", "GENERATED", "TIGHTEN-CALLS", "TIGHTEN-SKIPPED", "COST-MAX", "TIME"]]
+
+def main():
+	presetsDir = os.path.join(os.path.dirname(__file__), "..", "presets")
+	for mapPath in sorted(glob.glob(os.path.join(os.path.abspath(presetsDir), "scenario-*.json"))):
+		presetName = os.path.basename(mapPath)
+		calls = {}
+		for lazy in [False, True]:
+			Preset(mapPath)
+			solution = aStar(HEURISTIC, lazy=lazy)
+			calls[lazy] = solution.tightenCalls
+			costMax = solution.content.cost.max()[0] if solution.content else ""
+			csvData.append([presetName, lazy, solution.expanded, solution.genereted, solution.tightenCalls, solution.tightenSkipped, costMax, solution.time])
+		logger.log("%s: %d tighten calls eagerly, %d lazily (%d saved)" % (presetName, calls[False], calls[True], calls[False] - calls[True]))
+	with open(logger.logFileName.replace(".log", "-lazyAStar.csv"), "w", newline="") as csvFile:
+		csvWriter = csv.writer(csvFile, quoting=csv.QUOTE_ALL)
+		for row in csvData:
+			csvWriter.writerow(row)
+
+if __name__ == '__main__':
+	main()
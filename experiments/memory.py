@@ -0,0 +1,51 @@
+"""
+Bytes allocated per generated search node on the scenario presets.
+The children of the root are tightened once, then many nodes are created from (copies of) their cables, as the search does.
+"""
+import csv
+import glob
+import os
+import tracemalloc
+
+from algorithm.aStar import getMovePairs, tightenOrNone
+from algorithm.node import Node
+from algorithm.solutionLog import SolutionLog
+from model.preset import Preset
+from utils.logger import Logger
+
+logger = Logger()
+HEURISTIC = "_heuristicShortestPath"
+NODES = 20000
+
+csvData = [["PRESET", "NODES", "BYTES-PER-NODE"]]
+
+def measure(mapPath) -> float:
+	preset = Preset(mapPath)
+	preset.model.setSolution(SolutionLog(HEURISTIC, preset.model.MAX_CABLE))
+	root = Node(cable=preset.model.cable, parent=None, heuristicFuncName=HEURISTIC)
+	cables = [tightenOrNone(root.cable, va, vb) for (va, vb) in getMovePairs(root)]
+	cables = [c for c in cables if c]
+	nodes = []
+	tracemalloc.start()
+	before = tracemalloc.take_snapshot()
+	for i in range(NODES):
+		nodes.append(Node(cable=cables[i % len(cables)][:], parent=root, heuristicFuncName=HEURISTIC))
+	after = tracemalloc.take_snapshot()
+	tracemalloc.stop()
+	allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+	# The list holding the nodes is not part of them
+	return (allocated - (len(nodes) * 8)) / len(nodes)
+
+def main():
+	presetsDir = os.path.join(os.path.dirname(__file__), "..", "presets")
+	for mapPath in sorted(glob.glob(os.path.join(os.path.abspath(presetsDir), "scenario-*.json"))):
+		bytesPerNode = measure(mapPath)
+		csvData.append([os.path.basename(mapPath), NODES, bytesPerNode])
+		logger.log("%s: %.0f bytes per node" % (os.path.basename(mapPath), bytesPerNode))
+	with open(logger.logFileName.replace(".log", "-memory.csv"), "w", newline="") as csvFile:
+		csvWriter = csv.writer(csvFile, quoting=csv.QUOTE_ALL)
+		for row in csvData:
+			csvWriter.writerow(row)
+
+if __name__ == '__main__':
+	main()
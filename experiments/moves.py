@@ -0,0 +1,36 @@
+"""
+Compares the joint move successor generator (both robots move at every step) with the single move one (one robot moves at every step)
+on the aStar test presets and the scenario presets
+"""
+import csv
+import glob
+import os
+
+from algorithm.aStar import aStar, MOVES_JOINT, MOVES_SINGLE
+from model.preset import Preset
+from tests.aStar import TestAStar
+from utils.logger import Logger
+
+logger = Logger()
+HEURISTIC = "_heuristicShortestPath"
+
+csvData = [["PRESET", "MOVES", "EXPANDED", "GENERATED", "COST-MAX", "COST-MIN", "TIME"]]
+
+def main():
+	presetsDir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "presets"))
+	mapPaths = [os.path.join(presetsDir, presetName) for presetName in TestAStar()._tests]
+	mapPaths += sorted(glob.glob(os.path.join(presetsDir, "scenario-*.json")))
+	for mapPath in mapPaths:
+		for moves in [MOVES_JOINT, MOVES_SINGLE]:
+			Preset(mapPath)
+			solution = aStar(HEURISTIC, moves=moves)
+			cost = solution.content.cost if solution.content else None
+			csvData.append([os.path.basename(mapPath), moves, solution.expanded, solution.genereted, cost.max()[0] if cost else "", cost.min()[0] if cost else "", solution.time])
+			logger.log("%s (%s moves): %d expanded, %d generated in %.2fs, cost = %s" % (os.path.basename(mapPath), moves, solution.expanded, solution.genereted, solution.time, repr(cost)))
+	with open(logger.logFileName.replace(".log", "-moves.csv"), "w", newline="") as csvFile:
+		csvWriter = csv.writer(csvFile, quoting=csv.QUOTE_ALL)
+		for row in csvData:
+			csvWriter.writerow(row)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,57 @@
+"""
+Queue operations per second of `PriorityQ` and `IndexedPriorityQ`: fill the queue, update a quarter of the keys, then drain it.
+`PriorityQ` has no way to update a key, so it gets a second enqueue of the updated items instead (what the search used to leave behind).
+"""
+import csv
+import random
+from timeit import default_timer as timer
+
+from utils.logger import Logger
+from utils.priorityQ import PriorityQ, IndexedPriorityQ
+
+logger = Logger()
+
+csvData = [["QUEUE", "ENTRIES", "ENQUEUE-PER-SECOND", "UPDATE-PER-SECOND", "DEQUEUE-PER-SECOND"]]
+
+class _Item(object):
+	def __init__(self, key):
+		self.key = key
+
+def _run(name, q, items, updated, update) -> list:
+	start = timer()
+	for item in items: q.enqueue(item)
+	enqueueTime = timer() - start
+	start = timer()
+	for item in updated:
+		item.key /= 2
+		update(item)
+	updateTime = timer() - start
+	start = timer()
+	dequeued = 0
+	while not q.isEmpty():
+		q.dequeue()
+		dequeued += 1
+	dequeueTime = timer() - start
+	row = [name, len(items), len(items) / enqueueTime, len(updated) / updateTime, dequeued / dequeueTime]
+	logger.log("%s with %d entries: %.0f enqueue/s, %.0f update/s, %.0f dequeue/s" % tuple(row))
+	return row
+
+def main():
+	rnd = random.Random(0)
+	for size in [100000, 1000000]:
+		keys = [rnd.random() for _ in range(size)]
+		items = [_Item(k) for k in keys]
+		updated = rnd.sample(items, size // 4)
+		q = PriorityQ(key1=lambda i: i.key, key2=lambda i: 0)
+		csvData.append(_run("PriorityQ", q, items, updated, q.enqueue))
+		items = [_Item(k) for k in keys]
+		updated = rnd.sample(items, size // 4)
+		q = IndexedPriorityQ(key1=lambda i: i.key, key2=lambda i: 0)
+		csvData.append(_run("IndexedPriorityQ", q, items, updated, q.decreaseKey))
+	with open(logger.logFileName.replace(".log", "-priorityQ.csv"), "w", newline="") as csvFile:
+		csvWriter = csv.writer(csvFile, quoting=csv.QUOTE_ALL)
+		for row in csvData:
+			csvWriter.writerow(row)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,45 @@
+"""
+Generates synthetic presets for the scaling experiments
+"""
+import json
+import os
+import random
+import tempfile
+
+CELL = 60 # The obstacles are placed on a jittered grid with this spacing
+OBSTACLE_SIZE = 25
+JITTER = 10
+MARGIN = 100
+
+def createRandomPreset(numObstacles: int, seed=0, cableLength=None) -> str:
+	"""
+	Writes a preset with `numObstacles` non-overlapping square obstacles to a temporary file.
+
+	The robots start above the obstacle field and the destinations are below it.
+
+	Returns
+	===
+	The absolute path of the generated JSON file
+	"""
+	rand = random.Random(seed)
+	cols = 1
+	while cols * cols < numObstacles: cols += 1
+	obstacles = []
+	for i in range(numObstacles):
+		(col, row) = (i % cols, i // cols)
+		x = MARGIN + col * CELL + rand.uniform(0, JITTER)
+		y = MARGIN + row * CELL + rand.uniform(0, JITTER)
+		corners = [(x, y), (x + OBSTACLE_SIZE, y), (x + OBSTACLE_SIZE, y + OBSTACLE_SIZE), (x, y + OBSTACLE_SIZE)]
+		obstacles.append(["%.4f, %.4f" % c for c in corners])
+	width = cols * CELL
+	bottom = MARGIN + (((numObstacles - 1) // cols) + 1) * CELL + MARGIN / 2
+	preset = {
+		"obstacles": obstacles,
+		"cable": ["%.4f, %.4f" % (MARGIN / 2, MARGIN / 2), "%.4f, %.4f" % (MARGIN / 2 + width / 3, MARGIN / 2)],
+		"destinations": ["%.4f, %.4f" % (MARGIN + width * 2 / 3, bottom), "%.4f, %.4f" % (MARGIN + width, bottom)],
+		"cableLength": cableLength if cableLength else 2 * (width + bottom)
+	}
+	(fd, path) = tempfile.mkstemp(prefix="random-%d-" % numObstacles, suffix=".json")
+	with os.fdopen(fd, "w") as jsonFile:
+		json.dump(preset, jsonFile, indent="\t")
+	return os.path.abspath(path)
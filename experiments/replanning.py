@@ -0,0 +1,45 @@
+"""
+Replan latency when the destination of robot A moves: a search from scratch with `aStar()` against `IncrementalPlanner.setDestination()`,
+which repairs the graph of the first plan. The first plan of the incremental planner is reported as well.
+"""
+import csv
+import glob
+import os
+
+from algorithm.aStar import aStar
+from algorithm.incremental import IncrementalPlanner, moveDestination
+from model.modelService import Model
+from model.preset import Preset
+from tests.aStar import getFreeLocationNear
+from utils.logger import Logger
+
+logger = Logger()
+model = Model()
+HEURISTIC = "_heuristicShortestPath"
+
+csvData = [["PRESET", "PLANNER", "EXPANDED", "GENERATED", "TIME", "COST-MAX", "COST-MIN"]]
+
+def _addRow(presetName, planner, solution) -> None:
+	cost = solution.content.cost if solution.content else None
+	csvData.append([presetName, planner, solution.expanded, solution.genereted, solution.time, cost.max()[0] if cost else "", cost.min()[0] if cost else ""])
+	logger.log("%s (%s): %d expanded, %d generated in %.2fs, cost = %s" % (presetName, planner, solution.expanded, solution.genereted, solution.time, repr(cost)))
+
+def main():
+	presetsDir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "presets"))
+	for mapPath in sorted(glob.glob(os.path.join(presetsDir, "scenario-*.json"))):
+		presetName = os.path.basename(mapPath)
+		Preset(mapPath)
+		(x, y) = getFreeLocationNear(model.robots[0].destination)
+		moveDestination(0, x, y)
+		_addRow(presetName, "A* (from scratch)", aStar(HEURISTIC))
+		Preset(mapPath)
+		planner = IncrementalPlanner(HEURISTIC)
+		_addRow(presetName, "Incremental (first plan)", planner.plan())
+		_addRow(presetName, "Incremental", planner.setDestination(0, x, y))
+	with open(logger.logFileName.replace(".log", "-replanning.csv"), "w", newline="") as csvFile:
+		csvWriter = csv.writer(csvFile, quoting=csv.QUOTE_ALL)
+		for row in csvData:
+			csvWriter.writerow(row)
+
+if __name__ == '__main__':
+	main()
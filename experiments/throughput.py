@@ -0,0 +1,34 @@
+"""
+Measures the search throughput (generated configurations per second) of A* on the scenario presets,
+along with the re-expansions under each re-open policy and the moves the length lower bound discards
+"""
+import csv
+import glob
+import os
+
+from algorithm.aStar import aStar
+from algorithm.node import REOPEN_NEVER, REOPEN_ON_BETTER
+from model.preset import Preset
+from utils.logger import Logger
+
+logger = Logger()
+HEURISTIC = "_heuristicShortestPath"
+
+csvData = [["PRESET", "REOPEN", "EXPANDED", "GENERATED", "REEXPANDED", "REOPENED", "LENGTH-PRUNED", "TIME", "GENERATED-PER-SECOND"]]
+
+def main():
+	presetsDir = os.path.join(os.path.dirname(__file__), "..", "presets")
+	for mapPath in sorted(glob.glob(os.path.join(os.path.abspath(presetsDir), "scenario-*.json"))):
+		for reopen in [REOPEN_NEVER, REOPEN_ON_BETTER]:
+			Preset(mapPath)
+			solution = aStar(HEURISTIC, reopen=reopen)
+			throughput = solution.genereted / solution.time
+			csvData.append([os.path.basename(mapPath), reopen, solution.expanded, solution.genereted, solution.reexpanded, solution.reopened, solution.lengthPruned, solution.time, throughput])
+			logger.log("%s (reopen = %s): %d generated in %.2fs (%.1f per second), %d re-expanded" % (os.path.basename(mapPath), reopen, solution.genereted, solution.time, throughput, solution.reexpanded))
+	with open(logger.logFileName.replace(".log", "-throughput.csv"), "w", newline="") as csvFile:
+		csvWriter = csv.writer(csvFile, quoting=csv.QUOTE_ALL)
+		for row in csvData:
+			csvWriter.writerow(row)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,54 @@
+"""
+Microbenchmark of the per-call cost of `tightenCable()` on the tighten test presets (memoization disabled),
+along with the cost of computing the location key the hot helpers use for every point
+"""
+import csv
+import os
+from statistics import mean
+from timeit import default_timer as timer, timeit
+
+from algorithm.cable import testTightenCable
+from model.preset import Preset
+from tests.tighten import TestTighten
+from utils.cgal.types import Point
+from utils.logger import Logger
+from utils.vertexUtils import ptToKey
+
+logger = Logger()
+REPEATS = 20
+
+csvData = [["PRESET", "GLOBAL-TRIANGULATION", "TIME-PER-TIGHTEN"]]
+
+def timeTighten(mapPath, globalTriangulation) -> float:
+	preset = Preset(mapPath, globalTriangulation=globalTriangulation)
+	preset.model.setTightenMemoCapacity(0)
+	start = timer()
+	for _ in range(REPEATS):
+		testTightenCable()
+	return (timer() - start) / REPEATS
+
+def timeKeys(count=100000) -> tuple:
+	pt = Point(123.456, 789.012)
+	formatted = timeit(lambda: '%.15f,%.15f' % (pt.x(), pt.y()), number=count) / count
+	keyed = timeit(lambda: ptToKey(pt), number=count) / count
+	return (formatted, keyed)
+
+def main():
+	presetsDir = os.path.join(os.path.dirname(__file__), "..", "presets")
+	for globalTriangulation in [False, True]:
+		times = []
+		for presetName in TestTighten()._tests:
+			mapPath = os.path.abspath(os.path.join(presetsDir, presetName))
+			elapsed = timeTighten(mapPath, globalTriangulation)
+			times.append(elapsed)
+			csvData.append([presetName, globalTriangulation, elapsed])
+		logger.log("Global triangulation = %s: %.3fms per tighten" % (globalTriangulation, mean(times) * 1000))
+	(formatted, keyed) = timeKeys()
+	logger.log("Point key: formatted string = %.3fus, location key = %.3fus" % (formatted * 1e6, keyed * 1e6))
+	with open(logger.logFileName.replace(".log", "-tighten.csv"), "w", newline="") as csvFile:
+		csvWriter = csv.writer(csvFile, quoting=csv.QUOTE_ALL)
+		for row in csvData:
+			csvWriter.writerow(row)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,52 @@
+"""
+Measures the preset load time (dominated by the reduced visibility graph) with and without the obstacle spatial index,
+and with the rotational sweep engine
+"""
+import csv
+import os
+from timeit import default_timer as timer
+
+from algorithm.visibility import ENGINE_ALL_PAIRS, ENGINE_SWEEP
+from experiments.randomMap import createRandomPreset
+from model.preset import Preset
+from utils.logger import Logger
+
+logger = Logger()
+
+csvData = [["OBSTACLES", "VERTICES", "EDGES", "TIME-EXHAUSTIVE", "TIME-INDEXED", "TIME-SWEEP", "SPEEDUP-INDEXED", "SPEEDUP-SWEEP"]]
+
+def countEdges(model) -> int:
+	return sum([len(v.gaps) for v in model.allVertexObjects])
+
+def getGaps(model) -> dict:
+	return {v.name: {u.name for u in v.gaps} for v in model.allVertexObjects}
+
+def timeLoad(mapPath, spatialIndex, engine=ENGINE_ALL_PAIRS) -> tuple:
+	start = timer()
+	preset = Preset(mapPath, spatialIndex=spatialIndex, visibilityEngine=engine, useCache=False)
+	return (timer() - start, preset)
+
+def main():
+	for numObstacles in [25, 50, 100, 200]:
+		mapPath = createRandomPreset(numObstacles)
+		try:
+			(exhaustive, preset) = timeLoad(mapPath, False)
+			edges = countEdges(preset.model)
+			gaps = getGaps(preset.model)
+			(indexed, preset) = timeLoad(mapPath, True)
+			if getGaps(preset.model) != gaps:
+				raise RuntimeError("The indexed visibility graph differs from the exhaustive one")
+			(sweep, preset) = timeLoad(mapPath, True, ENGINE_SWEEP)
+			if getGaps(preset.model) != gaps:
+				raise RuntimeError("The sweep visibility graph differs from the exhaustive one")
+			csvData.append([numObstacles, len(preset.model.allVertexObjects), edges, exhaustive, indexed, sweep, exhaustive / indexed, exhaustive / sweep])
+			logger.log("%d obstacles: exhaustive = %.3fs, indexed = %.3fs, sweep = %.3fs" % (numObstacles, exhaustive, indexed, sweep))
+		finally:
+			os.remove(mapPath)
+	with open(logger.logFileName.replace(".log", "-visibility.csv"), "w", newline="") as csvFile:
+		csvWriter = csv.writer(csvFile, quoting=csv.QUOTE_ALL)
+		for row in csvData:
+			csvWriter.writerow(row)
+
+if __name__ == '__main__':
+	main()
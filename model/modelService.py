@@ -1,6 +1,11 @@
+from utils.gridIndex import PointGrid
 from utils.logger import Logger
+from utils.lruCache import LruCache
 
 logger = Logger()
+TIGHTEN_MEMO_CAPACITY = 50000
+TRMPP_MEMO_CAPACITY = 20000
+SMALL_DISTANCE = 1 # in pixels
 
 class Model(object):
 	class __PrivateModel:
@@ -13,12 +18,20 @@ class Model(object):
 			self.cable = [] # Initial Cable Config
 			self.canvas = None # The Canvas class (not the tk.Canvas object)
 			self.app = None # To read GUI attributes
-			self._vertexByLocation = {} # This is all vertices including robots and destinations
+			self._vertexIdByLocation = {} # Location key (see ptToKey()) -> dense integer id of every registered location
+			self._vertexById = [] # Id -> the vertex at that location, this is all vertices including robots and destinations
+			self.vertexGrid = PointGrid(SMALL_DISTANCE) # Every registered vertex, for snapping points to vertices (see getClosestVertex())
 			self._vertexObjects = []
 			self.tempVertices = {} # This is used in partial calculation
 			self._tmpACounter = 0
 			self._tmpBCounter = 0
 			self.solution = None
+			self.preset = None # The Preset that populated this model, so copies of it can be loaded (see ParallelExpander). `None` once the model is edited.
+			self.obstacleIndex = None # Spatial index over obstacle edges (see Geom.buildObstacleIndex())
+			self.tightenMemo = LruCache(TIGHTEN_MEMO_CAPACITY) # (cable, destA, destB) -> tightened cable (see tightenCable())
+			self.trmppMemo = LruCache(TRMPP_MEMO_CAPACITY) # (cable key, max cable) -> cost of the sub-search (see Node._heuristicTrmpp())
+			self.destinationDistances = None # One list per robot, indexed by Vertex.vid (see algorithm.distanceField)
+			self.workspaceTriangulation = None # When set, tightenCable() extracts sleeves from this mesh (see WorkspaceTriangulation)
 
 	instance = None
 
@@ -35,6 +48,9 @@ class Model(object):
 	def __getattr__(self, name):
 		return getattr(self.instance, name)
 
+	def setPreset(self, preset):
+		self.instance.preset = preset
+
 	def setSolution(self, solution):
 		self.instance.solution = solution
 
@@ -44,23 +60,70 @@ class Model(object):
 	def setApp(self, app):
 		self.instance.app = app
 
+	def setObstacleIndex(self, index):
+		self.instance.obstacleIndex = index
+
+	def setDestinationDistances(self, distances):
+		self.instance.destinationDistances = distances
+
+	def setWorkspaceTriangulation(self, triangulation):
+		self.instance.workspaceTriangulation = triangulation
+
+	def setTightenMemoCapacity(self, capacity: int):
+		"""
+		Zero disables memoization of `tightenCable()`
+		"""
+		self.instance.tightenMemo.setCapacity(capacity)
+
+	def setTrmppMemoCapacity(self, capacity: int):
+		"""
+		Zero disables memoization of the sub-searches of `Node._heuristicTrmpp()`
+		"""
+		self.instance.trmppMemo.setCapacity(capacity)
+
 	def setMaxCable(self, l, log=False):
 		self.instance.MAX_CABLE = l
 		logger.log("MAX CABLE = %d" % self.instance.MAX_CABLE)
 
 	def addVertexByLocation(self, vert):
-		self.instance._vertexByLocation[ptToStringId(vert.loc)] = vert
+		"""
+		Registers the vertex under the integer id of its location, see `getVertexId()`
+		"""
+		key = ptToKey(vert.loc)
+		vid = self.instance._vertexIdByLocation.get(key)
+		if vid is None:
+			vid = len(self.instance._vertexById)
+			self.instance._vertexIdByLocation[key] = vid
+			self.instance._vertexById.append(vert)
+		else:
+			self.instance._vertexById[vid] = vert
+		vert.vid = vid
+		self.instance.vertexGrid.insert(vert, *key)
 		if vert.name.startswith("tmp-"):
 			self.instance.tempVertices[vert.name] = vert
 
+	def getVertexId(self, x, y):
+		"""
+		Returns
+		===
+		The dense integer id of a registered location or `None`. Ids are never reused, so they can index per-vertex arrays.
+		"""
+		return self.instance._vertexIdByLocation.get(xyToKey(x, y))
+
+	def getVertexById(self, vid):
+		return self.instance._vertexById[vid]
+
 	def getVertexByLocation(self, x, y):
-		return self.instance._vertexByLocation.get(xyToStringId(x, y), None)
+		vid = self.instance._vertexIdByLocation.get(xyToKey(x, y))
+		return None if vid is None else self.instance._vertexById[vid]
 
 	def removeTempVertex(self, vert):
 		if not vert.name.startswith("tmp-"): return
 		vert.removeShape()
 		self.instance.entities.pop(vert.name, None)
-		self.instance._vertexByLocation.pop(ptToStringId(vert.loc), None)
+		vid = self.instance._vertexIdByLocation.get(ptToKey(vert.loc))
+		if vid is not None: self.instance._vertexById[vid] = None
+		self.instance.vertexGrid.remove(vert)
 		self.instance.tempVertices.pop(vert.name, None)
 
 	def addTempVertex(self, vert, isA):
@@ -74,6 +137,149 @@ class Model(object):
 		self.instance.entities[vert.name] = vert
 		self.addVertexByLocation(vert)
 
+	def setDestination(self, index, dest):
+		"""
+		Replaces the destination of robot `index` with `dest`, a new vertex since the location of a vertex never changes.
+		Only the registration of the two vertices is updated, see `algorithm.incremental.moveDestination()` for the gaps and distance fields.
+		The model no longer matches its preset file, so `preset` is cleared and the searches that load copies of it in workers refuse to run.
+		"""
+		self.instance.preset = None
+		robot = self.instance.robots[index]
+		if robot.destination: self._unregisterVertex(robot.destination)
+		robot.destination = dest
+		self.instance.entities[dest.name] = dest
+		self.addVertexByLocation(dest)
+		self.instance._vertexObjects = []
+
+	def _unregisterVertex(self, vert):
+		"""
+		The location keeps its id, it only stops pointing to this vertex
+		"""
+		vert.removeShape()
+		vid = self.instance._vertexIdByLocation.get(ptToKey(vert.loc))
+		if vid is not None and self.instance._vertexById[vid] is vert: self.instance._vertexById[vid] = None
+		self.instance.vertexGrid.remove(vert)
+
+	def registerObstacle(self, obstacle):
+		"""
+		Adds the obstacle and its vertices to the model, without updating the visibility graph (see `addObstacle()`)
+		"""
+		self.instance.entities[obstacle.name] = obstacle
+		self.instance.obstacles.append(obstacle)
+		numVerts = len(obstacle.vertices)
+		for j in range(numVerts):
+			v = obstacle.vertices[j]
+			v.adjacentOnObstacle = {obstacle.vertices[j - 1], obstacle.vertices[(j + 1) % numVerts]}
+			self.instance.entities[v.name] = v
+			self.instance.vertices.append(v)
+			self.addVertexByLocation(v)
+		self.instance._vertexObjects = []
+
+	def _unregisterObstacle(self, obstacle):
+		obstacle.removeShape()
+		self.instance.entities.pop(obstacle.name, None)
+		self.instance.obstacles.remove(obstacle)
+		for v in obstacle.vertices:
+			self._unregisterVertex(v)
+			self.instance.entities.pop(v.name, None)
+			self.instance.vertices.remove(v)
+		self.instance._vertexObjects = []
+
+	def addObstacle(self, pts, name=None):
+		"""
+		Adds an obstacle to a populated model. The visibility graph is only updated around it (see `updateGapsInBoxes()`)
+		and the caches that depend on the obstacles are invalidated (see `invalidateObstacleCaches()`).
+		The obstacle must not cover a robot, a destination or the cable.
+
+		pts: The corners of the obstacle (utils.cgal.types.Point)
+
+		Returns
+		===
+		The new Obstacle, named after the first free index (`O<i>`) unless `name` is given
+		"""
+		# Imported here since these modules depend on the model
+		import utils.cgal.geometry as Geom
+		from algorithm.visibility import updateGapsInBoxes
+		from model.obstacle import Obstacle
+		if not name:
+			i = len(self.instance.obstacles)
+			while "O%d" % i in self.instance.entities: i += 1
+			name = "O%d" % i
+		obstacle = Obstacle(name=name, pts=pts)
+		self.registerObstacle(obstacle)
+		if self.instance.obstacleIndex: Geom.addObstacleToIndex(self.instance.obstacleIndex, obstacle)
+		checked = updateGapsInBoxes(addedBoxes=[obstacle.getBoundingBox()], added=obstacle.vertices)
+		self.invalidateObstacleCaches()
+		logger.log("Added %s, checked %d pairs of vertices" % (name, checked))
+		return obstacle
+
+	def removeObstacle(self, name):
+		"""
+		Removes an obstacle the cable does not wrap around. Only the visibility graph around it is updated, see `addObstacle()`.
+		"""
+		import utils.cgal.geometry as Geom
+		from algorithm.visibility import updateGapsInBoxes
+		obstacle = self._getMovableObstacle(name)
+		if self.instance.obstacleIndex: Geom.removeObstacleFromIndex(self.instance.obstacleIndex, obstacle)
+		self._unregisterObstacle(obstacle)
+		checked = updateGapsInBoxes(removedBoxes=[obstacle.getBoundingBox()], removed=obstacle.vertices)
+		self.invalidateObstacleCaches()
+		logger.log("Removed %s, checked %d pairs of vertices" % (name, checked))
+
+	def moveObstacle(self, name, dx, dy):
+		"""
+		Translates an obstacle the cable does not wrap around. The visibility graph is only updated around its old and new places, see `addObstacle()`.
+
+		Returns
+		===
+		The moved Obstacle, a new object with new vertices under the same names since the location of a vertex never changes
+		"""
+		import utils.cgal.geometry as Geom
+		from algorithm.visibility import updateGapsInBoxes
+		from model.obstacle import Obstacle
+		old = self._getMovableObstacle(name)
+		if self.instance.obstacleIndex: Geom.removeObstacleFromIndex(self.instance.obstacleIndex, old)
+		self._unregisterObstacle(old)
+		obstacle = Obstacle(name=name, pts=[Geom.addVectorToPoint(pt, dx, dy) for pt in old.pts])
+		self.registerObstacle(obstacle)
+		if self.instance.obstacleIndex: Geom.addObstacleToIndex(self.instance.obstacleIndex, obstacle)
+		checked = updateGapsInBoxes(addedBoxes=[obstacle.getBoundingBox()], removedBoxes=[old.getBoundingBox()], added=obstacle.vertices, removed=old.vertices)
+		self.invalidateObstacleCaches()
+		logger.log("Moved %s by (%.2f, %.2f), checked %d pairs of vertices" % (name, dx, dy, checked))
+		return obstacle
+
+	def _getMovableObstacle(self, name):
+		obstacle = self.instance.entities[name]
+		if any([v in self.instance.cable for v in obstacle.vertices]):
+			raise ValueError("The cable wraps around %s, it cannot be moved or removed" % name)
+		return obstacle
+
+	def invalidateObstacleCaches(self):
+		"""
+		Called after the obstacles changed: clears the memos of `tightenCable()` and of the Trmpp heuristic,
+		then computes the distance fields and the workspace triangulation (if the model has them) again.
+		The model no longer matches its preset file, so `preset` is cleared as well.
+		"""
+		from algorithm.distanceField import computeDestinationDistances
+		from algorithm.workspaceTriangulation import WorkspaceTriangulation
+		self.instance.preset = None
+		self.instance.tightenMemo.clear()
+		self.instance.trmppMemo.clear()
+		if self.instance.destinationDistances is not None: self.setDestinationDistances(computeDestinationDistances())
+		if self.instance.workspaceTriangulation: self.setWorkspaceTriangulation(WorkspaceTriangulation())
+
+	def resetSearchState(self):
+		"""
+		Clears everything a search leaves behind in the model (solution, temp vertices and triangulation edges)
+		while keeping the geometry and the visibility graph, so another search can run on the same world.
+		"""
+		for vert in list(self.instance.tempVertices.values()):
+			self.removeTempVertex(vert)
+		self.instance._tmpACounter = 0
+		self.instance._tmpBCounter = 0
+		self.removeTriangulationEdges()
+		self.instance.solution = None
+
 	def removeTriangulationEdges(self):
 		for key in list(self.instance.entities.keys()):
 			if not key.startswith("TE-"): continue
@@ -89,14 +295,14 @@ class Model(object):
 			self.instance._vertexObjects = self.instance.vertices + self.instance.robots + [self.instance.robots[0].destination, self.instance.robots[1].destination]
 		return self.instance._vertexObjects
 
-def ptToStringId(pt):
+def ptToKey(pt):
 	"""
-	Use this method internally to obtain a unique Id for each point in this triangulation
+	Use this method internally to obtain a unique key for the location of each point
 	"""
-	return xyToStringId(pt.x(), pt.y())
+	return (pt.x(), pt.y())
 
-def xyToStringId(x, y):
+def xyToKey(x, y):
 	"""
-	Use this method internally to obtain a unique Id for each point in this triangulation
+	Use this method internally to obtain a unique key for the location of each point
 	"""
-	return '%.15f,%.15f' % (x, y)
+	return (x, y)
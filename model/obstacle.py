@@ -4,7 +4,7 @@ from model.modelService import Model
 from model.vertex import Vertex
 from utils.cgal.drawing import CreatePolygon
 from utils.cgal.types import Polygon
-from utils.vertexUtils import ptToStringId, convertToPoint
+from utils.vertexUtils import ptToKey, convertToPoint
 
 OBSTACLE_COLOR = "Grey"
 mode = Model()
@@ -25,24 +25,39 @@ class Obstacle(Entity):
 		self._vertexByLocation = {}
 		self._pts = pts
 		self.polygon = Polygon(self._pts)
+		self.edges = list(self.polygon.edges()) # Kept so the same segment objects can be removed from `model.obstacleIndex`
 		self.createVertices(pts)
 
 	def createVertices(self, pts):
 		for i in range(0, len(pts)):
 			v = Vertex(name="%s-%d" % (self.name, i), loc=pts[i], ownerObs=self)
 			self.vertices.append(v)
-			self._vertexByLocation[ptToStringId(v)] = v
+			self._vertexByLocation[ptToKey(v)] = v
 
 	def createShape(self, canvas):
 		if self.canvasId: return
 		self.canvas = canvas
 		self.canvasId = CreatePolygon(canvas=self.canvas.tkCanvas, pointsList=self._pts, outline="", fill=self.color, width=1, tag=self.name)
 
+	@property
+	def pts(self) -> list:
+		return self._pts
+
+	def getBoundingBox(self) -> tuple:
+		"""
+		Returns
+		===
+		(xMin, yMin, xMax, yMax)
+		"""
+		xs = [pt.x() for pt in self._pts]
+		ys = [pt.y() for pt in self._pts]
+		return (min(xs), min(ys), max(xs), max(ys))
+
 	def enclosesPoint(self, pt):
 		return Geom.isInsidePoly(self.polygon, convertToPoint(pt))
 
 	def getVertex(self, pt) -> Vertex:
-		return self._vertexByLocation.get(ptToStringId(pt), None)
+		return self._vertexByLocation.get(ptToKey(pt), None)
 
 	def areAdjacent(self, pt1, pt2) -> bool:
 		v1 = self.getVertex(pt1)
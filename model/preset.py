@@ -1,7 +1,11 @@
 import json
 import os
 
-from algorithm.visibility import processReducedVisibilityGraph
+import utils.cgal.geometry as Geom
+import model.visibilityCache as VisibilityCache
+from algorithm.distanceField import computeDestinationDistances
+from algorithm.visibility import processReducedVisibilityGraph, ENGINE_ALL_PAIRS
+from algorithm.workspaceTriangulation import WorkspaceTriangulation
 from model.modelService import Model
 from model.cable import Cable
 from model.destination import Destination
@@ -13,11 +17,25 @@ from utils.logger import Logger
 logger = Logger()
 
 class Preset(object):
-	def __init__(self, path):
+	def __init__(self, path, spatialIndex=True, visibilityEngine=ENGINE_ALL_PAIRS, useCache=True, globalTriangulation=False):
+		"""
+		spatialIndex: When `True` the obstacle edges are registered in a grid so visibility checks only test nearby edges
+
+		visibilityEngine: See `processReducedVisibilityGraph()`
+
+		useCache: When `True` the reduced visibility graph is read from (or written to) a sidecar file next to the preset
+
+		globalTriangulation: When `True` the workspace is triangulated once and `tightenCable()` extracts the sleeves from it
+		"""
 		self.model = Model(True)
 		self.path = path
+		self.spatialIndex = spatialIndex
+		self.visibilityEngine = visibilityEngine
+		self.useCache = useCache
+		self.globalTriangulation = globalTriangulation
 		self.fileName = os.path.basename(path)
 		self._parsedJson: dict = None
+		self.model.setPreset(self)
 		self._build()
 		logger.log("Preset: %s" % self.fileName)
 
@@ -27,7 +45,46 @@ class Preset(object):
 		with open(self.path, 'r') as jsonFile:
 			self._parsedJson = json.load(jsonFile)
 		self._populateModel()
-		processReducedVisibilityGraph()
+		if self.spatialIndex:
+			self.model.setObstacleIndex(Geom.buildObstacleIndex(self.model.obstacles))
+		if self.globalTriangulation:
+			self.model.setWorkspaceTriangulation(WorkspaceTriangulation())
+		if not (self.useCache and VisibilityCache.loadGaps(self.path, self.model)):
+			processReducedVisibilityGraph(engine=self.visibilityEngine)
+			if self.useCache:
+				VisibilityCache.saveGaps(self.path, self.model)
+		self.model.setDestinationDistances(computeDestinationDistances())
+
+	@property
+	def options(self) -> dict:
+		"""
+		The keyword arguments this preset was loaded with
+		"""
+		return {"spatialIndex": self.spatialIndex, "visibilityEngine": self.visibilityEngine, "useCache": self.useCache, "globalTriangulation": self.globalTriangulation}
+
+	def sweepMaxCable(self, maxCables, search):
+		"""
+		Runs `search` once per cable length on the geometry of this preset, which is loaded only once.
+
+		Params
+		===
+		maxCables: An iterable of cable lengths
+
+		search: A function with no arguments that runs the search on the model and returns its `SolutionLog`
+
+		Returns
+		===
+		A generator of `(maxCable, SolutionLog)`. The solution is `None` if the search raised an exception.
+		"""
+		for maxCable in maxCables:
+			self.model.resetSearchState()
+			self.model.setMaxCable(maxCable)
+			try:
+				solution = search()
+			except Exception as e:
+				logger.log(e)
+				solution = None
+			yield (maxCable, solution)
 
 	def _populateModel(self):
 		for e in self._parsedJson:
@@ -84,15 +141,5 @@ class Preset(object):
 		for obsVerts in obsArr:
 			pts = [Point(*[float(c) for c in v.split(',')]) for v in obsVerts]
 			o = Obstacle(name='O%s' % i, pts=pts)
-			self.model.entities[o.name] = o
-			self.model.obstacles.append(o)
-			numVerts = len(o.vertices)
+			self.model.registerObstacle(o)
 			i += 1
-			for j in range(numVerts):
-				v = o.vertices[j]
-				prevV = o.vertices[j - 1]
-				nextV = o.vertices[j + 1 if j + 1 < numVerts else 0]
-				v.adjacentOnObstacle = {prevV, nextV}
-				self.model.entities[v.name] = v
-				self.model.vertices.append(v)
-				self.model.addVertexByLocation(v)
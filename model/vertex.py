@@ -1,3 +1,5 @@
+from itertools import count
+
 import utils.cgal.geometry as Geom
 from model.modelService import Model
 from model.entity import Entity
@@ -14,15 +16,26 @@ class Vertex(Entity):
 
 	loc: Point
 
+	locKey: The location key of `loc` (see `ptToKey()`), computed once since `loc` does not change
+
+	uid: An integer that is unique to this vertex object, used in cable keys (see `getCableKey()`)
+
+	vid: The integer id of the location once the vertex is registered in the model (see `Model.addVertexByLocation()`)
+
 	ownerObs: Obstacle that this vertex is on
 
 	adjacent: list The two other vertices of the owner obstacle, adjacent to this vertex
 
 	gaps: a set of the vertices adjacent to this vertex on the reduced visibility graph. The term Gap is borrowed from Gap Navigation
 	"""
+	_uidCounter = count()
+
 	def __init__(self, name, loc, ownerObs=None, color=VERTEX_COLOR):
 		super().__init__(color=color, name=name)
 		self.loc = loc
+		self.locKey = (loc.x(), loc.y())
+		self.vid = None
+		self.uid = next(Vertex._uidCounter)
 		self.ownerObs = ownerObs
 		self.adjacentOnObstacle = set()
 		self.gaps = set()
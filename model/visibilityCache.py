@@ -0,0 +1,99 @@
+"""
+Binary sidecar cache of the reduced visibility graph.
+
+The file sits next to the preset JSON and holds the `gaps` of every vertex in `model.allVertexObjects`,
+stored as indices into that list. It is keyed by a hash of the geometry (obstacles, robots and destinations),
+so changing anything else in the preset (e.g. the cable length) still hits the cache.
+
+Layout (little-endian)
+===
+* 4 bytes magic and 1 byte format version
+* 32 bytes SHA-256 of the geometry
+* uint32 number of vertices
+* For each vertex: uint32 number of gaps followed by that many uint32 vertex indices
+"""
+import hashlib
+import os
+import struct
+from array import array
+
+from utils.logger import Logger
+
+logger = Logger()
+
+MAGIC = b"TPVG"
+VERSION = 1
+EXTENSION = ".gaps"
+
+def getCachePath(presetPath: str) -> str:
+	return os.path.splitext(presetPath)[0] + EXTENSION
+
+def getGeometryHash(model) -> bytes:
+	sha = hashlib.sha256()
+	for o in model.obstacles:
+		sha.update(struct.pack("<I", len(o.vertices)))
+		for v in o.vertices:
+			sha.update(struct.pack("<dd", v.loc.x(), v.loc.y()))
+	for r in model.robots:
+		sha.update(struct.pack("<dd", r.loc.x(), r.loc.y()))
+		sha.update(struct.pack("<dd", r.destination.loc.x(), r.destination.loc.y()))
+	return sha.digest()
+
+def _toLittleEndian(arr: array) -> array:
+	if struct.pack("=I", 1) != struct.pack("<I", 1): arr.byteswap()
+	return arr
+
+def saveGaps(presetPath: str, model) -> None:
+	verts = model.allVertexObjects
+	indices = {v: i for (i, v) in enumerate(verts)}
+	body = array("I", [len(verts)])
+	for v in verts:
+		body.append(len(v.gaps))
+		body.extend(sorted([indices[u] for u in v.gaps]))
+	cachePath = getCachePath(presetPath)
+	# Written next to the cache and renamed over it, so a reader never sees a half written file
+	tempPath = "%s.%d.tmp" % (cachePath, os.getpid())
+	try:
+		with open(tempPath, "wb") as cacheFile:
+			cacheFile.write(MAGIC + struct.pack("<B", VERSION) + getGeometryHash(model))
+			cacheFile.write(_toLittleEndian(body).tobytes())
+		os.replace(tempPath, cachePath)
+	except OSError as err:
+		if os.path.isfile(tempPath): os.remove(tempPath)
+		logger.log("Could not write visibility cache: %s" % err)
+
+def loadGaps(presetPath: str, model) -> bool:
+	"""
+	Populates the `gaps` of every vertex from the cache.
+
+	Returns
+	===
+	`False` if there is no cache file, it was computed for a different geometry or it is damaged, in which case the model is not touched
+	"""
+	cachePath = getCachePath(presetPath)
+	if not os.path.isfile(cachePath): return False
+	with open(cachePath, "rb") as cacheFile:
+		content = cacheFile.read()
+	header = len(MAGIC) + 1
+	if len(content) < header + 32: return False
+	if content[:len(MAGIC)] != MAGIC or content[len(MAGIC)] != VERSION: return False
+	if content[header:header + 32] != getGeometryHash(model): return False
+	verts = model.allVertexObjects
+	try:
+		body = array("I")
+		body.frombytes(content[header + 32:])
+		body = _toLittleEndian(body)
+		if not body or body[0] != len(verts): return False
+		allGaps = []
+		i = 1
+		for v in verts:
+			degree = body[i]
+			if i + 1 + degree > len(body): return False
+			allGaps.append({verts[j] for j in body[i + 1:i + 1 + degree]})
+			i += 1 + degree
+	except (ValueError, IndexError):
+		return False
+	if i != len(body): return False
+	for (v, gaps) in zip(verts, allGaps):
+		v.gaps = gaps
+	return True
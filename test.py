@@ -1,12 +1,12 @@
 import sys
 
-from tests.visibility import TestVisibility
+from tests.visibility import TestVisibility, TestObstacleEdits
 from tests.tighten import TestTighten
 from tests.aStar import TestAStar
 from tests.unitTest import Verbosity
 
 def main(verbosity=Verbosity.NONE):
-	unitTests = [TestVisibility(), TestTighten(), TestAStar()]
+	unitTests = [TestVisibility(), TestObstacleEdits(), TestTighten(), TestTighten(globalTriangulation=True), TestAStar(), TestAStar(lazy=True), TestAStar(incremental=True), TestAStar(hda=True)]
 	for test in unitTests:
 		print("Running %s: %d test cases" % (test.name, test.numTests))
 		result = test.run(verbosity)
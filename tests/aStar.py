@@ -2,13 +2,40 @@ import os
 
 from model.preset import Preset
 from algorithm.aStar import aStar
+from algorithm.hdaStar import hdaStar
+from algorithm.incremental import IncrementalPlanner, moveDestination
+from model.modelService import Model
 from tests.unitTest import UnitTest, TestResults, Verbosity
+from utils.cgal.types import Point
 from utils.vertexUtils import removeRepeatedVertsOrdered
 
+def getFreeLocationNear(vert, distance=20) -> tuple:
+	"""
+	Returns
+	===
+	The first of the locations `distance` away from the vertex along the axes that is not inside an obstacle, or `None`
+	"""
+	for (dx, dy) in [(1, 0), (0, 1), (-1, 0), (0, -1)]:
+		pt = Point(vert.loc.x() + dx * distance, vert.loc.y() + dy * distance)
+		if not any([o.enclosesPoint(pt) for o in Model().obstacles]): return (pt.x(), pt.y())
+	return None
+
 class TestAStar(UnitTest):
-	def __init__(self):
+	def __init__(self, lazy=False, incremental=False, hda=False):
+		"""
+		lazy: Runs the same cases with the lazy search, which tightens each child only when it is dequeued
+
+		incremental: Runs the same cases with `IncrementalPlanner`, after moving the destination of each robot away and back.
+		The plans for the moved destinations must cost the same as a search from scratch.
+
+		hda: Runs the same cases with `hdaStar()` over two worker processes
+		"""
 		self._presetsDir = os.path.join(os.path.dirname(__file__), "..", "presets")
-		super().__init__(name="aStar", tests={
+		self._lazy = lazy
+		self._incremental = incremental
+		self._hda = hda
+		name = "aStar (Lazy)" if lazy else "aStar (Incremental)" if incremental else "aStar (HDA*)" if hda else "aStar"
+		super().__init__(name=name, tests={
 			"10.json": ["[R1, D1]", "[R2, D2]"],
 			"aStar1.json": ["[R1, O0-1, O0-2, D1]", "[R2, O1-0, O1-3, D2]"],
 			"aStar2.json": ["[R1, D1]", "[R2, D2]"],
@@ -19,6 +46,39 @@ class TestAStar(UnitTest):
 		paths = [removeRepeatedVertsOrdered(p) for p in paths]
 		return repr(paths[0]) == self._tests[presetName][0] and repr(paths[1]) == self._tests[presetName][1]
 
+	def _replan(self, mapPath: str) -> tuple:
+		"""
+		Moves the destination of each robot away and back with the planner.
+		Each plan for a moved destination is compared with a search from scratch to the same destination.
+
+		Returns
+		===
+		(the solution once both destinations are back, list of (incremental cost, cost from scratch) of the moved destinations)
+		"""
+		locations = []
+		expected = []
+		for index in [0, -1]:
+			Preset(mapPath)
+			dest = Model().robots[index].destination
+			(x, y) = getFreeLocationNear(dest)
+			locations.append((index, (dest.loc.x(), dest.loc.y()), (x, y)))
+			moveDestination(index, x, y)
+			solution = aStar("_heuristicShortestPath")
+			expected.append(solution.content.cost if solution.content else None)
+		Preset(mapPath)
+		planner = IncrementalPlanner("_heuristicShortestPath")
+		solution = planner.plan()
+		costs = []
+		for ((index, original, moved), cost) in zip(locations, expected):
+			movedSolution = planner.setDestination(index, *moved)
+			costs.append((movedSolution.content.cost if movedSolution.content else None, cost))
+			solution = planner.setDestination(index, *original)
+		return (solution, costs)
+
+	def _isSameCost(self, cost1, cost2) -> bool:
+		if not cost1 or not cost2: return cost1 is cost2
+		return all([abs(cost1[i] - cost2[i]) < 1e-6 for i in [0, 1]])
+
 	def run(self, verbosity=Verbosity.NONE) -> TestResults:
 		results = TestResults(self.name)
 		for presetName in self._tests:
@@ -29,16 +89,22 @@ class TestAStar(UnitTest):
 			try:
 				mapPath = os.path.join(self._presetsDir, presetName)
 				mapPath = os.path.abspath(mapPath)
-				preset = Preset(mapPath)
-				solution = aStar()
-				paths = solution.getPaths()
-				if self._isCorrectSolution(paths, presetName):
+				if self._incremental:
+					(solution, costs) = self._replan(mapPath)
+				elif self._hda:
+					preset = Preset(mapPath)
+					(solution, costs) = (hdaStar("_heuristicShortestPath", workers=2), [])
+				else:
+					preset = Preset(mapPath)
+					(solution, costs) = (aStar("_heuristicShortestPath", lazy=self._lazy), [])
+				paths = solution.content.paths
+				if self._isCorrectSolution(paths, presetName) and all([self._isSameCost(*c) for c in costs]):
 					if verbosity > Verbosity.MEDIUM: self._reportSuccessfulTest(presetName)
 					results.passed += 1
 				else:
 					results.failed += 1
 					if verbosity > Verbosity.LEAST:
-						self._reportFailedTest(presetName, paths)
+						self._reportFailedTest(presetName, (paths, costs) if costs else paths)
 			except Exception as e:
 				results.exception += 1
 				if verbosity > Verbosity.NONE:
@@ -5,10 +5,14 @@ from model.preset import Preset
 from tests.unitTest import UnitTest, TestResults, Verbosity
 
 class TestTighten(UnitTest):
-	def __init__(self):
+	def __init__(self, globalTriangulation=False):
+		"""
+		globalTriangulation: Runs the same cases with the sleeves extracted from the workspace triangulation
+		"""
+		self._globalTriangulation = globalTriangulation
 		self._presetsDir = os.path.join(os.path.dirname(__file__), "..", "presets")
 		# None indicates expected failed test that needs debugging
-		super().__init__(name="Tighten", tests={
+		super().__init__(name="Tighten (Workspace)" if globalTriangulation else "Tighten", tests={
 			"default.json": "[D1, O0-0, O0-1, O1-1, O1-2, D2]",
 			"1.json": "[O1-3, R1, O0-0, O0-1, O1-1]",
 			"2.json": "[O0-0, O0-1, O0-2]",
@@ -47,7 +51,7 @@ class TestTighten(UnitTest):
 			try:
 				mapPath = os.path.join(self._presetsDir, presetName)
 				mapPath = os.path.abspath(mapPath)
-				preset = Preset(mapPath)
+				preset = Preset(mapPath, globalTriangulation=self._globalTriangulation)
 				finalCable = testTightenCable()
 				finalCableStr = repr(finalCable)
 				if finalCableStr == self._tests[presetName]:
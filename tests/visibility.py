@@ -1,7 +1,9 @@
 import os
 
+from algorithm.visibility import ENGINE_SWEEP, processReducedVisibilityGraph
 from model.preset import Preset
 from tests.unitTest import UnitTest, TestResults, Verbosity
+from utils.cgal.types import Point
 
 class TestVisibility(UnitTest):
 	def __init__(self):
@@ -19,6 +21,9 @@ class TestVisibility(UnitTest):
 				counter += 1
 		return counter
 
+	def _getGaps(self, preset: Preset) -> dict:
+		return {v.name: sorted([u.name for u in v.gaps]) for v in preset.model.allVertexObjects}
+
 	def run(self, verbosity=Verbosity.NONE) -> TestResults:
 		results = TestResults(self.name)
 		for presetName in self._tests:
@@ -29,9 +34,23 @@ class TestVisibility(UnitTest):
 			try:
 				mapPath = os.path.join(self._presetsDir, presetName)
 				mapPath = os.path.abspath(mapPath)
-				preset = Preset(mapPath)
+				preset = Preset(mapPath, useCache=False)
 				count = self._countEdges(preset)
-				if count == self._tests[presetName]:
+				gaps = self._getGaps(preset)
+				# The sweep engine must find exactly the same gaps as the all-pairs engine
+				sweepGaps = self._getGaps(Preset(mapPath, visibilityEngine=ENGINE_SWEEP, useCache=False))
+				# The second load reads the gaps from the sidecar file written by the first one
+				Preset(mapPath)
+				cachedGaps = self._getGaps(Preset(mapPath))
+				if sweepGaps != gaps:
+					results.failed += 1
+					if verbosity > Verbosity.LEAST:
+						self._reportFailedTest(presetName, "%d (sweep engine found different gaps)" % count)
+				elif cachedGaps != gaps:
+					results.failed += 1
+					if verbosity > Verbosity.LEAST:
+						self._reportFailedTest(presetName, "%d (cached gaps are different)" % count)
+				elif count == self._tests[presetName]:
 					if verbosity > Verbosity.MEDIUM: self._reportSuccessfulTest(presetName)
 					results.passed += 1
 				else:
@@ -43,3 +62,59 @@ class TestVisibility(UnitTest):
 				if verbosity > Verbosity.NONE:
 					self._reportException(presetName, e)
 		return results
+
+class TestObstacleEdits(UnitTest):
+	def __init__(self):
+		"""
+		Adds, moves and removes an obstacle, the gaps after each edit must be the same as after a full rebuild.
+		Each test is [the box (xMin, yMin, xMax, yMax) of the added square, the name of the moved obstacle, the translation, the name of the removed obstacle].
+		"""
+		self._presetsDir = os.path.join(os.path.dirname(__file__), "..", "presets")
+		super().__init__(name="Visibility (Obstacle Edits)", tests={
+			"10.json": [(240, 300, 260, 320), "O2", (20, -30), "O1"],
+			"aStar1.json": [(240, 300, 260, 320), "O2", (20, -30), "O1"],
+			"scenario-1.json": [(230, 260, 250, 280), "O3", (10, 10), "O1"],
+		})
+
+	def _getGaps(self, model) -> dict:
+		return {v.name: sorted([u.name for u in v.gaps]) for v in model.allVertexObjects}
+
+	def _getRebuiltGaps(self, model) -> dict:
+		for v in model.allVertexObjects:
+			v.gaps = set()
+		processReducedVisibilityGraph()
+		return self._getGaps(model)
+
+	def run(self, verbosity=Verbosity.NONE) -> TestResults:
+		results = TestResults(self.name)
+		for presetName in self._tests:
+			if not self._tests[presetName]:
+				if verbosity > Verbosity.MEDIUM: self._reportSkippedTest(presetName)
+				results.skipped += 1
+				continue
+			try:
+				mapPath = os.path.join(self._presetsDir, presetName)
+				mapPath = os.path.abspath(mapPath)
+				model = Preset(mapPath, useCache=False).model
+				((xMin, yMin, xMax, yMax), moved, (dx, dy), removed) = self._tests[presetName]
+				edits = [
+					("add", lambda: model.addObstacle([Point(xMin, yMin), Point(xMax, yMin), Point(xMax, yMax), Point(xMin, yMax)])),
+					("move", lambda: model.moveObstacle(moved, dx, dy)),
+					("remove", lambda: model.removeObstacle(removed)),
+				]
+				different = []
+				for (edit, func) in edits:
+					func()
+					if self._getGaps(model) != self._getRebuiltGaps(model): different.append(edit)
+				if not different:
+					if verbosity > Verbosity.MEDIUM: self._reportSuccessfulTest(presetName)
+					results.passed += 1
+				else:
+					results.failed += 1
+					if verbosity > Verbosity.LEAST:
+						self._reportFailedTest(presetName, "different gaps after %s" % ", ".join(different))
+			except Exception as e:
+				results.exception += 1
+				if verbosity > Verbosity.NONE:
+					self._reportException(presetName, e)
+		return results
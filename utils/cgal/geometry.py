@@ -2,6 +2,7 @@ from typing import List
 import numpy as np
 from utils.cgal.types import Line, Point, PointOrSegmentNone, Polygon, Ray, Segment, Vector, crossProduct, intersection
 import utils.shapely.geometry as SHGeom
+from utils.gridIndex import SegmentGrid
 from utils.vertexUtils import convertToPoint, removeRepeatedVertsOrdered, SMALL_DISTANCE
 from math import sqrt, fabs, nan
 
@@ -145,6 +146,16 @@ def lengthOfCurve(pts: list):
 		l += vertexDistance(pts[i], pts[i + 1])
 	return l
 
+def distanceMatrix(verts1: list, verts2: list) -> np.ndarray:
+	"""
+	Returns
+	===
+	A `len(verts1) x len(verts2)` array with the distance between every pair of the two lists, computed at once
+	"""
+	a = np.array([(pt.x(), pt.y()) for pt in map(convertToPoint, verts1)], dtype=float).reshape(-1, 2)
+	b = np.array([(pt.x(), pt.y()) for pt in map(convertToPoint, verts2)], dtype=float).reshape(-1, 2)
+	return np.hypot(a[:, None, 0] - b[None, :, 0], a[:, None, 1] - b[None, :, 1])
+
 def centroid(pts):
 	arr = [convertToPoint(pt) for pt in pts]
 	cx = np.mean([pt.x() for pt in arr])
@@ -188,10 +199,55 @@ def addVectorToPoint(pt, dx, dy):
 	_pt = convertToPoint(pt)
 	return _pt + vect
 
+def segmentIntersectsBox(v1, v2, box: tuple) -> bool:
+	"""
+	Whether the segment between the two points crosses or touches the axis aligned box (xMin, yMin, xMax, yMax), by clipping it (Liang-Barsky)
+	"""
+	pt1 = convertToPoint(v1)
+	pt2 = convertToPoint(v2)
+	(x, y) = (pt1.x(), pt1.y())
+	(dx, dy) = (pt2.x() - x, pt2.y() - y)
+	(tMin, tMax) = (0, 1)
+	for (p, q) in [(-dx, x - box[0]), (dx, box[2] - x), (-dy, y - box[1]), (dy, box[3] - y)]:
+		if p == 0:
+			if q < 0: return False
+			continue
+		t = q / p
+		if p < 0:
+			tMin = max(tMin, t)
+		else:
+			tMax = min(tMax, t)
+		if tMin > tMax: return False
+	return True
+
+def buildObstacleIndex(obstacles) -> SegmentGrid:
+	"""
+	Registers every edge of every obstacle in a uniform grid.
+	The cell size is the mean edge length so that an edge occupies only a handful of cells.
+	"""
+	edges = [edge for o in obstacles for edge in o.edges]
+	if not edges: return None
+	meanLength = sum([sqrt(edge.squared_length()) for edge in edges]) / len(edges)
+	grid = SegmentGrid(max(meanLength, SMALL_DISTANCE))
+	for o in obstacles:
+		addObstacleToIndex(grid, o)
+	return grid
+
+def addObstacleToIndex(grid: SegmentGrid, obstacle) -> None:
+	for edge in obstacle.edges:
+		(src, tgt) = (edge.source(), edge.target())
+		grid.insert(edge, src.x(), src.y(), tgt.x(), tgt.y())
+
+def removeObstacleFromIndex(grid: SegmentGrid, obstacle) -> None:
+	for edge in obstacle.edges:
+		grid.remove(edge)
+
 def isVisible(v1, v2):
 	pt1 = convertToPoint(v1)
 	pt2 = convertToPoint(v2)
 	l = Segment(pt1, pt2)
+	if model.obstacleIndex:
+		return _isVisibleIndexed(pt1, pt2, l)
 	for o in model.obstacles:
 		intersections = o.intersection(l)
 		# if vertices are visible, the intersection is either empty or it is a line segment
@@ -209,6 +265,23 @@ def isVisible(v1, v2):
 				pass
 	return True
 
+def _isVisibleIndexed(pt1: Point, pt2: Point, l: Segment) -> bool:
+	"""
+	Same as the exhaustive check in `isVisible()`, but only the obstacle edges in the grid cells crossed by `l` are tested
+	"""
+	for edge in model.obstacleIndex.query(pt1.x(), pt1.y(), pt2.x(), pt2.y()):
+		if isBlockedBy(l, edge, pt1, pt2):
+			return False
+	return True
+
+def isBlockedBy(l: Segment, edge: Segment, pt1: Point, pt2: Point) -> bool:
+	"""
+	Whether the obstacle edge blocks the visibility segment `l` from `pt1` to `pt2` (the same rule used in `isVisible()`)
+	"""
+	inter = intersection(l, edge)
+	# Segments show that an edge is tangent to the visibility ray, they don't block visibility
+	return isinstance(inter, Point) and not (inter == pt1 or inter == pt2)
+
 def circleAndLineSegmentIntersection(pt1, pt2, center, radius):
 	return SHGeom.circleAndLineSegmentIntersection(pt1, pt2, center, radius)
 
@@ -0,0 +1,150 @@
+"""
+Uniform grid spatial indices used to avoid scanning every obstacle in the hot geometric queries
+"""
+from math import floor, sqrt
+
+class SegmentGrid(object):
+	"""
+	A uniform grid of square cells. Each item is registered under every cell its segment passes through.
+
+	A query with a segment returns every item registered in the cells that the query segment passes through.
+	The result is conservative: it is a superset of the items whose segments intersect the query segment.
+	"""
+	def __init__(self, cellSize: float):
+		if cellSize <= 0: raise ValueError("cellSize must be positive")
+		self.cellSize = cellSize
+		# Padding used so that floating point error never drops a cell the segment touches
+		self._pad = cellSize * 1e-6
+		# (col, row) -> list of item indices
+		self._cells = {}
+		# index -> (item, bounding box)
+		self._items = {}
+		self._ids = {}
+		self._counter = 0
+
+	def __repr__(self):
+		return "SegmentGrid(cellSize = %.2f, items = %d, cells = %d)" % (self.cellSize, len(self._items), len(self._cells))
+
+	def __len__(self):
+		return len(self._items)
+
+	def _cell(self, v: float) -> int:
+		return floor(v / self.cellSize)
+
+	def _cellsOnSegment(self, x1, y1, x2, y2) -> list:
+		"""
+		Walks the columns spanned by the segment and, for each column, the rows spanned by the part of the segment inside that column.
+		"""
+		if x1 > x2:
+			(x1, y1, x2, y2) = (x2, y2, x1, y1)
+		cells = []
+		pad = self._pad
+		colStart = self._cell(x1 - pad)
+		colEnd = self._cell(x2 + pad)
+		dx = x2 - x1
+		for col in range(colStart, colEnd + 1):
+			if dx == 0:
+				(yA, yB) = (y1, y2)
+			else:
+				left = max(x1, col * self.cellSize)
+				right = min(x2, (col + 1) * self.cellSize)
+				yA = y1 + (y2 - y1) * ((left - x1) / dx)
+				yB = y1 + (y2 - y1) * ((right - x1) / dx)
+			rowStart = self._cell(min(yA, yB) - pad)
+			rowEnd = self._cell(max(yA, yB) + pad)
+			for row in range(rowStart, rowEnd + 1):
+				cells.append((col, row))
+		return cells
+
+	def insert(self, item, x1, y1, x2, y2) -> None:
+		index = self._counter
+		self._counter += 1
+		bbox = (min(x1, x2) - self._pad, min(y1, y2) - self._pad, max(x1, x2) + self._pad, max(y1, y2) + self._pad)
+		self._items[index] = (item, bbox, self._cellsOnSegment(x1, y1, x2, y2))
+		self._ids.setdefault(id(item), []).append(index)
+		for cell in self._items[index][2]:
+			self._cells.setdefault(cell, []).append(index)
+
+	def remove(self, item) -> None:
+		"""
+		Removes every registration of the given item (identity comparison)
+		"""
+		for index in self._ids.pop(id(item), []):
+			(_, _, cells) = self._items.pop(index)
+			for cell in cells:
+				members = self._cells[cell]
+				members.remove(index)
+				if not members: self._cells.pop(cell)
+
+	def query(self, x1, y1, x2, y2) -> list:
+		"""
+		Returns the items that might intersect the segment (x1, y1) -> (x2, y2)
+		"""
+		(xMin, yMin, xMax, yMax) = (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+		seen = set()
+		result = []
+		for cell in self._cellsOnSegment(x1, y1, x2, y2):
+			for index in self._cells.get(cell, ()):
+				if index in seen: continue
+				seen.add(index)
+				(item, bbox, _) = self._items[index]
+				# Cheap bounding box rejection before handing the item to the exact (and expensive) test
+				if bbox[0] > xMax or bbox[2] < xMin or bbox[1] > yMax or bbox[3] < yMin: continue
+				result.append(item)
+		return result
+
+class PointGrid(object):
+	"""
+	A uniform grid of square cells where each item is registered under the cell that contains its point.
+
+	A query returns the items within a radius of a point, in the order they were inserted,
+	probing only the cells that overlap the square around the point.
+	"""
+	def __init__(self, cellSize: float):
+		if cellSize <= 0: raise ValueError("cellSize must be positive")
+		self.cellSize = cellSize
+		# (col, row) -> list of (sequence, item, x, y)
+		self._cells = {}
+		# id(item) -> (cell, sequence)
+		self._ids = {}
+		self._counter = 0
+
+	def __repr__(self):
+		return "PointGrid(cellSize = %.2f, items = %d, cells = %d)" % (self.cellSize, len(self._ids), len(self._cells))
+
+	def __len__(self):
+		return len(self._ids)
+
+	def _cell(self, v: float) -> int:
+		return floor(v / self.cellSize)
+
+	def insert(self, item, x, y) -> None:
+		"""
+		Inserting an item that is already in the grid moves it (and it counts as inserted last)
+		"""
+		self.remove(item)
+		cell = (self._cell(x), self._cell(y))
+		self._cells.setdefault(cell, []).append((self._counter, item, x, y))
+		self._ids[id(item)] = (cell, self._counter)
+		self._counter += 1
+
+	def remove(self, item) -> None:
+		entry = self._ids.pop(id(item), None)
+		if not entry: return
+		(cell, sequence) = entry
+		members = self._cells[cell]
+		members[:] = [m for m in members if m[0] != sequence]
+		if not members: self._cells.pop(cell)
+
+	def query(self, x, y, radius) -> list:
+		"""
+		Returns a list of (item, distance) for the items strictly closer than `radius` to (x, y), in insertion order
+		"""
+		found = []
+		for col in range(self._cell(x - radius), self._cell(x + radius) + 1):
+			for row in range(self._cell(y - radius), self._cell(y + radius) + 1):
+				for (sequence, item, ix, iy) in self._cells.get((col, row), ()):
+					dist = sqrt((ix - x) ** 2 + (iy - y) ** 2)
+					if dist < radius: found.append((sequence, item, dist))
+		found.sort(key=lambda f: f[0])
+		return [(item, dist) for (_, item, dist) in found]
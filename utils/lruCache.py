@@ -0,0 +1,48 @@
+"""
+A bounded least-recently-used cache that counts its hits and misses
+"""
+from collections import OrderedDict
+
+class LruCache(object):
+	def __init__(self, capacity: int):
+		"""
+		capacity: The maximum number of entries. Zero disables the cache.
+		"""
+		self.capacity = capacity
+		self.hits = 0
+		self.misses = 0
+		self._data = OrderedDict()
+
+	def __repr__(self):
+		return "LRU(count = %d, capacity = %d, hits = %d, misses = %d)" % (len(self), self.capacity, self.hits, self.misses)
+
+	def __len__(self):
+		return len(self._data)
+
+	def get(self, key) -> tuple:
+		"""
+		Returns
+		===
+		A tuple (found: bool, value)
+		"""
+		if key in self._data:
+			self._data.move_to_end(key)
+			self.hits += 1
+			return (True, self._data[key])
+		self.misses += 1
+		return (False, None)
+
+	def put(self, key, value) -> None:
+		if self.capacity <= 0: return
+		self._data[key] = value
+		self._data.move_to_end(key)
+		while len(self._data) > self.capacity:
+			self._data.popitem(last=False)
+
+	def setCapacity(self, capacity: int) -> None:
+		self.capacity = capacity
+		while len(self._data) > max(self.capacity, 0):
+			self._data.popitem(last=False)
+
+	def clear(self) -> None:
+		self._data.clear()
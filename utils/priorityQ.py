@@ -48,3 +48,100 @@ class PriorityQ(object):
 
 	def isEmpty(self):
 		return len(self) == 0
+
+class IndexedPriorityQ(object):
+	"""
+	A priority queue that knows which items it holds, so the key of a queued item can be updated.
+
+	An update pushes a new entry and marks the old one as removed (lazy deletion), so every operation is still a heapq call.
+	Removed entries are skipped by `dequeue()` and dropped altogether once they outnumber the live ones.
+	"""
+	_REMOVED = object()
+	_MIN_COMPACT_SIZE = 1024
+
+	def __init__(self, key1, key2):
+		"""
+		key1: a function to return the primary key (or the cost) associated with the given item
+		key2: a function to return the secondary key (or the cost) associated with the given item to be used as tie breaker for key1
+		"""
+		self._counter = 0
+		self._key1 = key1
+		self._key2 = key2
+		self._data = []
+		self._entries = {} # id(item) -> the live entry of the item
+
+	def __repr__(self):
+		return 'IQ(count = %d, stale = %d)' % (len(self), len(self._data) - len(self))
+
+	def __len__(self):
+		"""
+		The number of live items (removed entries are not counted)
+		"""
+		return len(self._entries)
+
+	def __contains__(self, item):
+		return id(item) in self._entries
+
+	def _createEntry(self, item):
+		"""
+		Same layout as `PriorityQ._createTuple()`, but a list so the item can be marked as removed
+		"""
+		self._counter += 1
+		return [self._key1(item), self._key2(item), self._counter, item]
+
+	def enqueue(self, item):
+		"""
+		Enqueueing an item that is already queued updates its key
+		"""
+		if item in self:
+			self.decreaseKey(item)
+			return
+		entry = self._createEntry(item)
+		self._entries[id(item)] = entry
+		heapq.heappush(self._data, entry)
+
+	def decreaseKey(self, item):
+		"""
+		Reads the keys of a queued item again and moves it accordingly.
+		It is named after the common case of finding a cheaper parent, but an increased key is handled as well.
+		"""
+		old = self._entries.pop(id(item))
+		old[-1] = IndexedPriorityQ._REMOVED
+		entry = self._createEntry(item)
+		self._entries[id(item)] = entry
+		heapq.heappush(self._data, entry)
+		if len(self._data) > max(2 * len(self._entries), IndexedPriorityQ._MIN_COMPACT_SIZE):
+			self._compact()
+
+	def remove(self, item):
+		"""
+		Removes a queued item, does nothing if it is not queued
+		"""
+		old = self._entries.pop(id(item), None)
+		if old: old[-1] = IndexedPriorityQ._REMOVED
+
+	def peekKey(self) -> tuple:
+		"""
+		Returns
+		===
+		The (primary, secondary) key of the item `dequeue()` would return
+		"""
+		while self._data and self._data[0][-1] is IndexedPriorityQ._REMOVED:
+			heapq.heappop(self._data)
+		if not self._data: raise IndexError("peek from an empty priority queue")
+		return (self._data[0][0], self._data[0][1])
+
+	def dequeue(self):
+		while self._data:
+			item = heapq.heappop(self._data)[-1]
+			if item is not IndexedPriorityQ._REMOVED:
+				del self._entries[id(item)]
+				return item
+		raise IndexError("dequeue from an empty priority queue")
+
+	def isEmpty(self):
+		return len(self) == 0
+
+	def _compact(self):
+		self._data = list(self._entries.values())
+		heapq.heapify(self._data)
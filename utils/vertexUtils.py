@@ -1,8 +1,7 @@
 import math
-from model.modelService import Model, ptToStringId as _ptToStringId
+from model.modelService import Model, SMALL_DISTANCE
 
 model = Model()
-SMALL_DISTANCE = 1 # in pixels
 
 def convertToPoint(vert):
 	"""
@@ -12,13 +11,18 @@ def convertToPoint(vert):
 		return vert.loc
 	return vert
 
-def ptToStringId(vert):
-	return _ptToStringId(convertToPoint(vert))
+def ptToKey(vert):
+	"""
+	A hashable key for the location of a Vertex or Point. Two points have the same key if and only if they have the same coordinates.
+	"""
+	if hasattr(vert, 'locKey'):
+		return vert.locKey
+	return (vert.x(), vert.y())
 
 def _convertVertListToDict(verts: list) -> dict:
 	vertDict = {}
 	for vert in verts:
-		vertDict[ptToStringId(vert)] = vert
+		vertDict[ptToKey(vert)] = vert
 	return vertDict
 
 def removeRepeatedVertsUnordered(verts: list) -> list:
@@ -30,19 +34,26 @@ def removeRepeatedVertsUnordered(verts: list) -> list:
 	vertDict = _convertVertListToDict(verts)
 	return list(vertDict.values())
 
+def getCableKey(cable: list, fractions=(1, 1)) -> tuple:
+	"""
+	A hashable key for a cable configuration: the `uid` of each vertex followed by the two fractions.
+	It tells apart the same vertices that `repr(cable)` does (e.g. a robot sitting on an obstacle vertex).
+	"""
+	return tuple([v.uid for v in cable]) + (fractions[0], fractions[1])
+
 def removeRepeatedVertsOrdered(verts: list) -> list:
 	"""
 	Takes a list (ordered) of Vertex and removes items that are sequentially repeated
 	"""
 	trimmed = []
 	# FIXME: For the lif of me, I don't know what's the logic behind making the list circular. Maybe there is a point to it?
-	# prev = ptToStringId(verts[-1])
-	prevId = ""
+	# prev = ptToKey(verts[-1])
+	prevKey = None
 	for vert in verts:
-		idStr = ptToStringId(vert)
-		if prevId != idStr:
+		key = ptToKey(vert)
+		if prevKey != key:
 			trimmed.append(vert)
-			prevId = idStr
+			prevKey = key
 	return trimmed
 
 def removeNoNameMembers(verts: list) -> list:
@@ -57,7 +68,7 @@ def removeNoNameMembers(verts: list) -> list:
 
 def appendIfNotRepeated(vrtList, vrt):
 	l = len(vrtList)
-	if l == 0 or ptToStringId(vrt) != ptToStringId(vrtList[l - 1]):
+	if l == 0 or ptToKey(vrt) != ptToKey(vrtList[l - 1]):
 		vrtList.append(vrt)
 
 def setSubtractPoints(verts1: list, verts2: list) -> list:
@@ -105,29 +116,37 @@ def _getClosestVertex(pt):
 			if dist == 0: return candidate
 	return candidate
 
-def getClosestVertex(pt):
-	candidate = None
-	for v in model.robots:
-		eq, dist = almostEqual(pt, v)
-		if eq:
-			candidate = v
-			if dist == 0: return candidate
-		eq, dist = almostEqual(pt, v.destination)
-		if eq:
-			candidate = v.destination
-			if dist == 0: return candidate
+def _snapOrder(vert) -> tuple:
+	"""
+	Robots and destinations (in the order R1, D1, R2, D2) come before obstacle vertices
+	"""
+	if vert.ownerObs: return (1, 0)
+	robot = vert.robot if hasattr(vert, 'robot') else vert
+	return (0, 2 * model.robots.index(robot) + (robot is not vert))
 
-	for v in model.vertices:
-		eq, dist = almostEqual(pt, v)
-		if eq:
-			candidate = v
-			if dist == 0: return candidate
+def getClosestVertex(pt):
+	"""
+	Snaps a point to a vertex registered in the model, probing only the grid cells around the point.
 
-	# For temp vertices we actually want equality
-	for tempVert in model.tempVertices.values():
-		if convertToPoint(pt) == convertToPoint(tempVert):
-			return tempVert
-	return candidate
+	Returns
+	===
+	The first vertex (see `_snapOrder()`) at exactly the same location, or else a temp vertex at exactly the same location,
+	or else the last vertex within `SMALL_DISTANCE`. `None` if there is no such vertex.
+	"""
+	pt = convertToPoint(pt)
+	near = []
+	tempVert = None
+	for (v, dist) in model.vertexGrid.query(pt.x(), pt.y(), SMALL_DISTANCE):
+		# For temp vertices we actually want equality
+		if v.name.startswith("tmp-"):
+			if dist == 0 and not tempVert: tempVert = v
+			continue
+		near.append((v, dist))
+	if not near: return tempVert
+	near.sort(key=lambda n: _snapOrder(n[0]))
+	for (v, dist) in near:
+		if dist == 0: return v
+	return tempVert if tempVert else near[-1][0]
 
 def findSubCable(cable, subCable) -> int:
 	A = cable